@@ -0,0 +1,66 @@
+from os import environ
+
+environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+from time import perf_counter  # noqa: E402
+from pygame.transform import smoothscale  # noqa: E402
+from game.widgets.base_widget import Widget  # noqa: E402
+from game.widgets.background import Background, BackgroundImage  # noqa: E402
+from settings import settings  # noqa: E402
+
+
+def per_frame(draw, frames: int) -> float:
+    """Возвращает среднее время одного кадра в миллисекундах."""
+    draw()
+    start = perf_counter()
+    for _ in range(frames):
+        draw()
+    return (perf_counter() - start) / frames * 1000
+
+
+def main(frames: int = 120, layers: int = 3) -> None:
+    pygame.init()
+    screen: pygame.Surface = pygame.display.set_mode(tuple(settings.window.size))
+    background: BackgroundImage = Background.create_background(
+        screen, settings.background_menu_path, (0, 0), screen.get_size()
+    )
+    size = background.size_of_surface
+
+    def uncached():
+        screen.blit(smoothscale(background.surface, size), background.coords)
+
+    def cached():
+        screen.blit(background.image, background.coords)
+
+    before = per_frame(uncached, frames)
+    after = per_frame(cached, frames)
+    idle = per_frame(background.draw, frames)
+    print(f'window {size[0]}x{size[1]}, {frames} frames')
+    print(f'smoothscale every frame: {before:8.3f} ms/frame')
+    print(f'cached scaled surface:   {after:8.3f} ms/frame')
+    print(f'speedup:                 {before / after:8.1f}x')
+    print(f'idle dirty-rect draw:    {idle:8.3f} ms/frame')
+
+    # Полная перерисовка фона с полупрозрачными слоями, как у тени в menu().
+    for layer in range(layers):
+        shadow = Widget.create_widget(
+            screen, pygame.Surface((size[0] // 2, size[1])), (size[0] // 4 + layer, 0)
+        )
+        shadow.surface.set_alpha(10)
+        background = background.add_child_surfaces(shadow)
+
+    def redraw():
+        background.mark_dirty()
+        background.draw()
+
+    layered = per_frame(redraw, frames)
+    background.composite = True
+    composite = per_frame(redraw, frames)
+    print(f'full redraw, {layers} alpha layers: {layered:8.3f} ms/frame')
+    print(f'full redraw, composite:      {composite:8.3f} ms/frame')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
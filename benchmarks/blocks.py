@@ -0,0 +1,54 @@
+from os import environ
+
+environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+from time import perf_counter  # noqa: E402
+from game.objects import DrawImage, ShapeImageGenerator  # noqa: E402
+
+
+def blocks_per_second(draw, blocks: int) -> float:
+    """Возвращает количество отрисованных блоков в секунду."""
+    start = perf_counter()
+    draw()
+    return blocks / (perf_counter() - start)
+
+
+def main(board_size: int = 8, rounds: int = 500) -> None:
+    pygame.init()
+    pygame.display.set_mode((board_size * 43, board_size * 43))
+    generator = ShapeImageGenerator()
+    drawer = DrawImage()
+    colors = next(iter(generator.COLORS.values()))
+    board = pygame.display.get_surface()
+    positions = [(x * 43, y * 43) for y in range(board_size) for x in range(board_size)]
+    blocks = len(positions) * rounds
+
+    def polygons():
+        for _ in range(rounds):
+            for x, y in positions:
+                drawer._render_3d_block(board, x, y, colors, 43, 4, 1)
+
+    def tiles():
+        for _ in range(rounds):
+            for x, y in positions:
+                drawer.draw_3d_block(board, x, y, colors, 43, 4, 1)
+
+    def batched():
+        for _ in range(rounds):
+            drawer.draw_blocks(board, positions, colors, 43, 4, 1)
+
+    print(f'board {board_size}x{board_size}, {rounds} redraws, SDL_VIDEODRIVER={environ["SDL_VIDEODRIVER"]}')
+    results = {
+        'pygame.draw polygons': blocks_per_second(polygons, blocks),
+        'cached tile blit': blocks_per_second(tiles, blocks),
+        'cached tile Surface.blits': blocks_per_second(batched, blocks),
+    }
+    baseline = results['pygame.draw polygons']
+    for name, rate in results.items():
+        print(f'{name:26} {rate:12,.0f} blocks/s  {rate / baseline:5.1f}x')
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
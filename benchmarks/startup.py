@@ -0,0 +1,77 @@
+import subprocess
+import sys
+from os import environ
+from pathlib import Path
+from statistics import median
+from time import time
+
+# Сколько ждать один запуск, в секундах: зависшая игра не должна вешать бенчмарк.
+TIMEOUT: float = 60.0
+
+# Запускает main.py и печатает время первого кадра (экран загрузки) и первого кадра после загрузки,
+# когда меню нарисовано и партию можно начать; на нём выходит.
+CHILD: str = '''
+import runpy, sys, time, pygame
+from game.assets import assets
+from game.scenes.loop import SceneLoop
+from game.scenes.menu import MenuScene
+state = {"first": False, "ready": False}
+def draw(original):
+    def wrapper(self):
+        rects = original(self)
+        state["ready"] = self.menu_background is not None and assets.idle
+        return rects
+    return wrapper
+def present(original):
+    def wrapper(self, rects):
+        original(self, rects)
+        if rects and not state["first"]:
+            state["first"] = True
+            print("first", time.time(), flush=True)
+        if state["ready"]:
+            print("ready", time.time(), flush=True)
+            sys.exit(0)
+    return wrapper
+MenuScene.draw = draw(MenuScene.draw)
+SceneLoop.present = present(SceneLoop.present)
+runpy.run_path("main.py", run_name="__main__")
+'''
+
+
+def launch(root: Path, timeout: float = TIMEOUT) -> tuple[float, float]:
+    """Возвращает время от запуска main.py до первого кадра и до меню после загрузки, в секундах.
+    Если игра не дошла до меню за timeout или упала — RuntimeError."""
+    env = dict(
+        environ, SDL_VIDEODRIVER=environ.get('SDL_VIDEODRIVER', 'dummy'), PYGAME_HIDE_SUPPORT_PROMPT='1'
+    )
+    start = time()
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD], cwd=root, env=env, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f'main.py did not reach the menu within {timeout:g} s') from None
+    stamps = dict(line.split() for line in result.stdout.splitlines() if line.startswith(('first ', 'ready ')))
+    if result.returncode != 0 or 'ready' not in stamps:
+        raise RuntimeError(f'main.py exited with code {result.returncode} before the menu:\n{result.stderr.strip()}')
+    return float(stamps['first']) - start, float(stamps['ready']) - start
+
+
+def main(runs: int = 5, timeout: float = TIMEOUT) -> int:
+    root = Path(__file__).resolve().parent.parent
+    times: list[tuple[float, float]] = []
+    try:
+        for _ in range(runs):
+            times.append(launch(root, timeout))
+    except RuntimeError as error:
+        print(f'startup benchmark failed: {error}', file=sys.stderr)
+        return 1
+    first, ready = (median(column) * 1000 for column in zip(*times))
+    print(f'{runs} runs, median time from launching main.py')
+    print(f'first frame:     {first:8.1f} ms')
+    print(f'loaded menu:     {ready:8.1f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
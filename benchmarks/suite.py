@@ -0,0 +1,501 @@
+from os import environ
+
+environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import json  # noqa: E402
+import platform  # noqa: E402
+import sys  # noqa: E402
+from argparse import ArgumentParser  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from statistics import median  # noqa: E402
+from time import perf_counter  # noqa: E402
+from typing import Callable, Dict, List  # noqa: E402
+
+import pygame  # noqa: E402
+
+# Метрики с такими единицами тем лучше, чем они больше; остальные (время) — чем меньше.
+RATE_UNITS: tuple[str, ...] = ('ops/s', 'blocks/s', 'shapes/s', 'checks/s', 'placements/s', 'moves/s')
+DEFAULT_BASELINE: Path = Path(__file__).resolve().parent / 'baseline.json'
+
+BENCHMARKS: Dict[str, Callable[[int], Dict[str, tuple[float, str]]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Регистрирует функцию замера; она возвращает {метрика: (значение, единица)}."""
+    def decorator(func: Callable[[int], Dict[str, tuple[float, str]]]) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def timed(func: Callable[[], object], repeat: int, number: int = 1) -> float:
+    """Возвращает медианное время одного вызова в миллисекундах."""
+    func()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((perf_counter() - start) / number * 1000)
+    return median(samples)
+
+
+def display(size: tuple[int, int]) -> pygame.Surface:
+    if not pygame.get_init():
+        pygame.init()
+    return pygame.display.set_mode(size)
+
+
+@benchmark('menu_frame')
+def menu_frame(repeat: int) -> Dict[str, tuple[float, str]]:
+    from settings import settings
+    from game.scenes.menu import build_menu
+
+    results: Dict[str, tuple[float, str]] = {}
+    for size in ((720, 480), (1280, 720), (1920, 1080)):
+        screen = display(size)
+        menu_background = build_menu(settings, screen)
+
+        def full():
+            menu_background.mark_dirty()
+            pygame.display.update(menu_background.draw())
+
+        def idle():
+            rects = menu_background.draw()
+            if rects:
+                pygame.display.update(rects)
+
+        results[f'{size[0]}x{size[1]}.full'] = (timed(full, repeat, 10), 'ms')
+        results[f'{size[0]}x{size[1]}.idle'] = (timed(idle, repeat, 100), 'ms')
+
+    # Изменение размера всего дерева меню с перерисовкой, как при перетаскивании края окна.
+    from game.assets import asset_cache
+    from game.widgets.background import Background
+
+    sizes = [(1280, 720), (1300, 740), (1320, 760)]
+    index = 0
+
+    def resize():
+        nonlocal menu_background, index
+        index = (index + 1) % len(sizes)
+        menu_background = Background.resize(menu_background, sizes[index])
+        pygame.display.update(menu_background.draw())
+
+    def resize_cold():
+        asset_cache.clear()
+        resize()
+
+    results['resize.cold'] = (timed(resize_cold, repeat, 3), 'ms')
+    results['resize'] = (timed(resize, repeat, 30), 'ms')
+    return results
+
+
+@benchmark('scene_graph')
+def scene_graph(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game.widgets.background import Background
+    from game.widgets.base_widget import Widget
+
+    screen = display((1280, 720))
+    # Дерево из 20 панелей по 10 плиток: 221 узел, как плотный интерфейс с текстом и иконками.
+    panels = []
+    for row in range(20):
+        panel = Widget.create_widget(screen, (1200, 30), (40, 30 + row * 33))
+        tiles = [Widget.create_widget(screen, (100, 24), (46 + column * 115, 33 + row * 33)) for column in range(10)]
+        panels.append(panel.add_child_surfaces(tiles))
+    tree = Background.create_background(screen, pygame.Surface((1280, 720)), (0, 0), (1280, 720), panels)
+    tree.draw()
+    leaves = [tile for panel in panels for tile in panel.child_surfaces]
+    index = 0
+
+    def one_dirty():
+        nonlocal index
+        index = (index + 1) % len(leaves)
+        leaves[index].mark_dirty()
+        tree.draw()
+
+    def full():
+        tree.mark_dirty()
+        tree.draw()
+
+    return {
+        'idle': (timed(tree.draw, repeat, 200), 'ms'),
+        'one_dirty': (timed(one_dirty, repeat, 200), 'ms'),
+        'full': (timed(full, repeat, 20), 'ms'),
+    }
+
+
+def prepared_scenes(screen: pygame.Surface):
+    """Менеджер сцен, меню которого дождалось своих ресурсов и подготовки партии, как в игре."""
+    from settings import settings
+    from game.assets import assets
+    from game.scenes.loop import SceneLoop, SceneManager
+    from game.scenes.menu import scenes as factories
+
+    manager = SceneManager(SceneLoop(pygame.time.Clock(), settings.game.FPS), factories(settings, screen))
+    menu = manager.get('menu')
+    while menu.menu_background is None or not assets.idle:
+        menu.update(0.0)
+        pygame.time.wait(1)
+    menu.draw()
+    return manager
+
+
+@benchmark('scenes')
+def scenes(repeat: int) -> Dict[str, tuple[float, str]]:
+    from settings import settings
+
+    screen = display(tuple(settings.window.size))
+
+    def switch(scene) -> None:
+        # Переключение — это вход в сцену и её первый кадр.
+        scene.enter()
+        scene.draw()
+
+    first: List[float] = []
+    for _ in range(repeat):
+        game = prepared_scenes(screen).get('game')
+        start = perf_counter()
+        switch(game)
+        first.append((perf_counter() - start) * 1000)
+    manager = prepared_scenes(screen)
+    menu, game = manager.get('menu'), manager.get('game')
+    switch(game)
+    modes: List[int] = [0]
+    set_mode = pygame.display.set_mode
+
+    def counted(*args, **kwargs):
+        modes[0] += 1
+        return set_mode(*args, **kwargs)
+
+    pygame.display.set_mode = counted
+    try:
+        return {
+            'menu_to_game.first': (median(first), 'ms'),
+            'game_to_menu': (timed(lambda: switch(menu), repeat, 5), 'ms'),
+            'menu_to_game': (timed(lambda: switch(game), repeat, 5), 'ms'),
+            'set_mode': (modes[0], 'calls'),
+        }
+    finally:
+        pygame.display.set_mode = set_mode
+
+
+@benchmark('drag')
+def drag(repeat: int) -> Dict[str, tuple[float, str]]:
+    from settings import settings
+
+    screen = display(tuple(settings.window.size))
+    game = prepared_scenes(screen).get('game')
+    game.enter()
+    game.draw()
+    board = game.board
+    _, rect = board.slot_sprite(0)
+    game.pick(rect.center)
+    game.draw()
+    area = board.board_rect().move(board.coords)
+    x, y = area.x + game.grab[0] + 5, area.y + game.grab[1] + 5
+    # Фигура над полем: курсор внутри одной клетки и с переходом в соседнюю.
+    inside = [(x + step % 3, y) for step in range(30)]
+    across = [(x + step % 2 * board.CELL, y) for step in range(30)]
+    positions = iter(range(10 ** 9))
+
+    def frame(path: List[tuple[int, int]]) -> Callable[[], object]:
+        def run():
+            # Пачка событий движения за кадр, как при быстром перетаскивании: считается только последнее.
+            for position in path[next(positions) % 2::2][:8]:
+                game.handle(pygame.event.Event(pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(1, 0, 0)))
+            game.draw()
+        return run
+
+    shape = game.game.offered[game.dragged]
+    return {
+        'hit_test': (timed(lambda: game.preview.cell(inside[0], shape, game.grab), repeat, 1000) * 1000, 'us'),
+        'frame.same_cell': (timed(frame(inside), repeat, 50), 'ms'),
+        'frame.new_cell': (timed(frame(across), repeat, 50), 'ms'),
+    }
+
+
+@benchmark('shape_images')
+def shape_images(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game.objects import DrawImage, ShapeImageGenerator
+
+    display((640, 480))
+
+    def cold():
+        ShapeImageGenerator._atlases.clear()
+        DrawImage._tiles.clear()
+        ShapeImageGenerator().images
+
+    generator = ShapeImageGenerator()
+    return {
+        'cold': (timed(cold, repeat), 'ms'),
+        'warm': (timed(lambda: generator.images, repeat, 100), 'ms'),
+    }
+
+
+@benchmark('draw_shape')
+def draw_shape(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game.objects import DrawImage, ShapeImageGenerator
+
+    display((640, 480))
+    generator = ShapeImageGenerator()
+    drawer = DrawImage()
+    shapes = list(generator.shapes.values())
+    colors = list(generator.COLORS.values())
+
+    def draw_all():
+        for palette in colors:
+            for shape in shapes:
+                drawer.draw_shape(shape, palette, 43, 4, 1)
+
+    elapsed = timed(draw_all, repeat, 5)
+    return {'throughput': (len(shapes) * len(colors) / elapsed * 1000, 'shapes/s')}
+
+
+@benchmark('tint')
+def tint(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game import tint as tinting
+    from game.objects import DrawImage, ShapeAtlas, ShapeImageGenerator
+
+    display((640, 480))
+    generator = ShapeImageGenerator()
+    drawer = DrawImage()
+    atlas = ShapeAtlas(generator.COLORS, generator.shapes, 43, 4, 1)
+    theme = tinting.shades((120, 80, 200))
+
+    def redraw():
+        # Прежний путь: каждый цвет рисуется примитивами заново.
+        DrawImage._tiles.clear()
+        for palette in generator.COLORS.values():
+            for shape in generator.shapes.values():
+                drawer.draw_shape(shape, palette, 43, 4, 1)
+
+    def cold():
+        tinting.block_labels.cache_clear()
+        ShapeAtlas(generator.COLORS, generator.shapes, 43, 4, 1).render_all()
+
+    labels = atlas.labels
+    row_bytes = labels.get_width() * labels.get_height() * 4
+    return {
+        'redraw_all': (timed(redraw, repeat, 5), 'ms'),
+        'atlas.cold': (timed(cold, repeat, 5), 'ms'),
+        'theme_row': (timed(lambda: tinting.tint(labels, theme), repeat, 20), 'ms'),
+        'labels': ((labels.get_pitch() * labels.get_height()) / 1024, 'KB'),
+        'row_rgba': (row_bytes / 1024, 'KB'),
+    }
+
+
+@benchmark('text')
+def text(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game import text as texts
+    from game.widgets.performance import PerformanceOverlay
+    from game.widgets.text import NumberWidget
+
+    screen = display((640, 480))
+    face = texts.font(None, 48)
+    atlas = texts.glyph_atlas(48)
+    score = NumberWidget(screen, (0, 0), atlas, 7)
+    box = pygame.Surface(score.size, pygame.SRCALPHA)
+    overlay = PerformanceOverlay(screen)
+    values = iter(range(10 ** 9))
+
+    def font_render():
+        # Прежний путь: счёт, меняющийся каждый кадр, отрисовывается шрифтом заново.
+        box.fill((0, 0, 0, 0))
+        box.blit(face.render(str(next(values)), True, texts.WHITE), (0, 0))
+
+    def glyphs():
+        score.value = next(values)
+
+    return {
+        'score.font_render': (timed(font_render, repeat, 200), 'ms'),
+        'score.glyphs': (timed(glyphs, repeat, 200), 'ms'),
+        'score.unchanged': (timed(lambda: setattr(score, 'value', score.value), repeat, 200), 'ms'),
+        'label.font_render': (timed(lambda: face.render('Score', True, texts.WHITE), repeat, 200), 'ms'),
+        'label.cached': (timed(lambda: texts.render('Score', 48), repeat, 200), 'ms'),
+        'overlay': (timed(overlay.render, repeat, 20), 'ms'),
+    }
+
+
+@benchmark('background')
+def background(repeat: int) -> Dict[str, tuple[float, str]]:
+    from settings import settings
+    from game.assets import asset_cache
+    from game.widgets.background import Background
+
+    screen = display(tuple(settings.window.size))
+    sizes = [tuple(settings.window.size), tuple(settings.window.minimal_size)]
+    widget = Background.create_background(screen, settings.background_menu_path, (0, 0), sizes[0])
+
+    def create():
+        Background.create_background(screen, settings.background_menu_path, (0, 0), sizes[0]).image
+
+    def create_cold():
+        asset_cache.clear()
+        create()
+
+    def resize():
+        nonlocal widget
+        sizes.reverse()
+        widget = Background.resize(widget, sizes[0])
+        widget.image
+
+    def resize_cold():
+        asset_cache.clear()
+        resize()
+
+    return {
+        'create_background.cold': (timed(create_cold, repeat), 'ms'),
+        'create_background': (timed(create, repeat, 10), 'ms'),
+        'resize.cold': (timed(resize_cold, repeat, 4), 'ms'),
+        'resize': (timed(resize, repeat, 10), 'ms'),
+    }
+
+
+@benchmark('board')
+def board(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game.shapes import shape_registry
+
+    registry = shape_registry()
+    shapes = list(registry)
+
+    def checks():
+        empty = registry.board()
+        for shape in shapes:
+            for x, y, _ in shape.placements:
+                empty.can_place(shape, x, y)
+
+    def fill_and_clear():
+        # Заполняет поле и очищает линии, пока фигуры помещаются.
+        current = registry.board()
+        for _ in range(200):
+            for shape in shapes:
+                positions = shape.positions(current.bits)
+                if positions:
+                    current.place(shape, *positions[0])
+
+    placements = sum(len(shape.placements) for shape in shapes)
+    return {
+        'can_place': (placements / timed(checks, repeat, 20) * 1000, 'checks/s'),
+        'place_and_clear': (200 * len(shapes) / timed(fill_and_clear, repeat) * 1000, 'placements/s'),
+    }
+
+
+@benchmark('solver')
+def solver(repeat: int) -> Dict[str, tuple[float, str]]:
+    from time import time
+
+    from game.shapes import shape_registry
+    from game.solver import search
+
+    registry = shape_registry()
+    sources = tuple(shape.source for shape in registry)
+    # Поле середины партии: несколько крупных фигур в фиксированных позициях.
+    current = registry.board()
+    for shape in list(registry)[-4:]:
+        current.place(shape, *shape.positions(current.bits)[-1])
+    order = sources[2], sources[4], sources[9]
+    first = tuple(registry[order[0]].positions(current.bits))
+
+    def full_search():
+        search(sources, registry.width, registry.height, current.bits, order, first, time() + 3600)
+
+    return {
+        'search.one_ordering': (timed(full_search, repeat), 'ms'),
+    }
+
+
+@benchmark('replay')
+def replay(repeat: int) -> Dict[str, tuple[float, str]]:
+    from game.replay import Recorder, encode, iter_replays, verify
+    from game.rules import Game
+    from game.shapes import shape_registry
+    from simulation.policies import first
+
+    registry = shape_registry()
+    # Корпус из 500 партий стратегии «первая подходящая позиция»: одинаковый при каждом запуске.
+    corpus: List[bytes] = []
+    for seed in range(500):
+        recorder = Recorder(Game(registry, seed))
+        while (move := first(recorder.game, None)) is not None:
+            recorder.play(*move)
+        corpus.append(encode(recorder.replay))
+    data = b''.join(corpus)
+    replays = list(iter_replays(data))
+    moves = sum(len(recorded.moves) for recorded in replays)
+    return {
+        'decode': (timed(lambda: list(iter_replays(data)), repeat), 'ms'),
+        'verify': (moves / timed(lambda: verify(replays, registry), repeat) * 1000, 'moves/s'),
+    }
+
+
+def run(names: List[str], repeat: int) -> Dict:
+    results: Dict[str, Dict] = {}
+    for name in names:
+        for metric, (value, unit) in BENCHMARKS[name](repeat).items():
+            results[f'{name}.{metric}'] = {'value': value, 'unit': unit}
+            print(f'{name + "." + metric:45} {value:14,.3f} {unit}')
+    pygame.quit()
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'video_driver': environ['SDL_VIDEODRIVER'],
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Возвращает метрики, которые ухудшились больше чем на threshold относительно базовых."""
+    regressions: List[str] = []
+    print(f'{"metric":45} {"baseline":>14}    {"current":>14} {"unit":13} {"slowdown":>7}')
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            continue
+        change = result['value'] / base['value'] - 1
+        if result['unit'] in RATE_UNITS:
+            change = -change
+        mark = ''
+        if change > threshold:
+            regressions.append(name)
+            mark = '  REGRESSION'
+        print(f'{name:45} {base["value"]:14,.3f} -> {result["value"]:14,.3f} {result["unit"]:13} {change:+7.1%}{mark}')
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = ArgumentParser(prog='python -m benchmarks', description='Headless BlockPad benchmarks.')
+    parser.add_argument('names', nargs='*', help=f'benchmarks to run, default all: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per measurement, the median is kept')
+    parser.add_argument('--output', type=Path, help='write the results as JSON')
+    parser.add_argument('--compare', action='store_true', help='compare against the baseline')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown before failing (0.1 = 10%%)')
+    args = parser.parse_args(argv)
+    unknown: List[str] = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+    # Без базы сравнивать не с чем: сообщаем до прогона, а не после нескольких минут замеров.
+    if args.compare and not args.update_baseline and not args.baseline.exists():
+        print(f'no baseline at {args.baseline}, run with --update-baseline first', file=sys.stderr)
+        return 1
+
+    current = run(args.names or list(BENCHMARKS), args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2))
+    if args.compare:
+        print()
+        regressions = compare(current, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) above {args.threshold:.0%}: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,321 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Hashable
+from weakref import WeakKeyDictionary
+
+import pygame
+
+# Бюджет кэша по умолчанию; в игре он берётся из настройки asset_cache_budget.
+DEFAULT_BUDGET: int = 128 * 1024 * 1024
+
+
+def to_display_format(surface: pygame.Surface) -> pygame.Surface:
+    """Переводит поверхность в формат дисплея, чтобы blit не конвертировал пиксели каждый раз.
+    Поверхность, уже имеющая этот формат (например, smoothscale такой же), возвращается без копии."""
+    if pygame.display.get_surface() is None:
+        return surface
+    alpha = surface.get_flags() & pygame.SRCALPHA
+    reference = pygame.Surface((1, 1), alpha)
+    reference = reference.convert_alpha() if alpha else reference.convert()
+    if (surface.get_bitsize(), surface.get_masks()) == (reference.get_bitsize(), reference.get_masks()):
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+
+class AssetCache:
+    """Общий кэш поверхностей: изображения по пути и их масштабированные варианты по размеру.
+
+    Все поверхности хранятся в формате дисплея. Давно не использованные записи вытесняются,
+    когда суммарный объём пикселей превышает budget байт. Используется из главного потока.
+
+    Масштабированные копии ищутся по самому объекту источника и его версии. Кто рисует в
+    поверхность, которую уже масштабировали, вызывает changed(); BaseWidget.mark_dirty делает это
+    за виджеты, рисующие в собственный источник."""
+
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        self.budget: int = budget
+        self.__entries: OrderedDict[Hashable, pygame.Surface] = OrderedDict()
+        self.__bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.__versions: WeakKeyDictionary[pygame.Surface, int] = WeakKeyDictionary()
+
+    def changed(self, source: pygame.Surface) -> None:
+        """Отмечает, что пиксели source изменились: прежние масштабированные копии больше не находятся
+        и вытесняются как обычно. Для поверхностей, которые не масштабировали, ничего не делает."""
+        version = self.__versions.get(source)
+        if version is not None:
+            self.__versions[source] = version + 1
+
+    def scaled_key(self, source: pygame.Surface, size: tuple[int, int]) -> Hashable:
+        return "scaled", source, self.__versions.setdefault(source, 0), tuple(size)
+
+    def image(self, path: str) -> pygame.Surface:
+        """Возвращает изображение по пути, загружая его только при промахе."""
+        key = ("image", path)
+        surface = self.get(key)
+        if surface is None:
+            surface = self.put(key, to_display_format(pygame.image.load(path)))
+        return surface
+
+    def scaled(self, source: pygame.Surface, size: tuple[int, int]) -> pygame.Surface:
+        """Возвращает source, сглаженно масштабированный до size; каждый размер считается один раз
+        на версию источника."""
+        size = tuple(size)
+        if source.get_size() == size:
+            return source
+        key = self.scaled_key(source, size)
+        surface = self.get(key)
+        if surface is None:
+            surface = to_display_format(pygame.transform.smoothscale(source, size))
+            # smoothscale теряет прозрачность всей поверхности, заданную через set_alpha.
+            if source.get_alpha() is not None and not source.get_flags() & pygame.SRCALPHA:
+                surface.set_alpha(source.get_alpha())
+            surface = self.put(key, surface)
+        return surface
+
+    def get(self, key: Hashable) -> pygame.Surface | None:
+        surface = self.__entries.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return surface
+
+    def put(self, key: Hashable, surface: pygame.Surface) -> pygame.Surface:
+        previous = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__bytes -= surface_bytes(previous)
+        self.__entries[key] = surface
+        self.__bytes += surface_bytes(surface)
+        self.evict()
+        return surface
+
+    def evict(self) -> None:
+        """Вытесняет самые старые записи, пока объём больше бюджета; последняя запись остаётся."""
+        while self.__bytes > self.budget and len(self.__entries) > 1:
+            _, surface = self.__entries.popitem(last=False)
+            self.__bytes -= surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__bytes = 0
+
+    @property
+    def bytes(self) -> int:
+        return self.__bytes
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self.__entries),
+            "bytes": self.__bytes,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class AssetHandle:
+    """Ресурс, который декодируется в фоновом потоке и доводится до готовности в главном."""
+
+    def __init__(
+            self,
+            key: Hashable,
+            future: Future,
+            finalize: Callable[[Any], Any] | None = None
+    ) -> None:
+        self.key = key
+        self.__future = future
+        self.__finalize = finalize
+        self.__ready: bool = False
+        self.__value: Any = None
+        self.__error: BaseException | None = None
+
+    @property
+    def decoded(self) -> bool:
+        """Фоновая часть работы закончена (успешно или с ошибкой)."""
+        return self.__future.done()
+
+    @property
+    def ready(self) -> bool:
+        """Ресурс готов к использованию: декодирован и доведён в главном потоке."""
+        return self.__ready
+
+    @property
+    def failed(self) -> bool:
+        return self.__error is not None
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.__error
+
+    def finalize(self) -> bool:
+        """Доводит декодированный ресурс до готовности; вызывается из главного потока."""
+        if self.__ready or self.__error is not None or not self.__future.done():
+            return False
+        try:
+            value = self.__future.result()
+            self.__value = self.__finalize(value) if self.__finalize is not None else value
+        except Exception as error:
+            self.__error = error
+            return False
+        self.__ready = True
+        return True
+
+    def result(self, timeout: float | None = None) -> Any:
+        """Возвращает ресурс, при необходимости дожидаясь его; вызывается из главного потока."""
+        if not self.__ready and self.__error is None:
+            self.__future.exception(timeout)
+            self.finalize()
+        if self.__error is not None:
+            raise self.__error
+        return self.__value
+
+    def __repr__(self) -> str:
+        state = "ready" if self.__ready else "failed" if self.__error else "decoded" if self.decoded else "loading"
+        return f"{self.__class__.__name__}({self.key!r}, {state})"
+
+
+class AssetLoader:
+    """Загружает изображения, звуки и другие тяжёлые ресурсы в фоновом потоке.
+
+    Фоновый поток только декодирует; перевод в формат дисплея делает pump() в главном потоке.
+    Повторный запрос ресурса, который ещё грузится, возвращает тот же дескриптор. Доведённый
+    дескриптор pump() забывает: готовое лежит в asset_cache и держится у того, кто его запросил,
+    а неудачную загрузку можно запросить заново."""
+
+    def __init__(self, workers: int = 1) -> None:
+        self.__workers = workers
+        self.__executor: ThreadPoolExecutor | None = None
+        self.__handles: dict[Hashable, AssetHandle] = {}
+        self.__waiting: list[AssetHandle] = []
+        self.__submitted: int = 0
+        self.__lock = Lock()
+
+    @staticmethod
+    def loaded(key: Hashable, value: Any) -> AssetHandle:
+        """Готовый дескриптор для ресурса, который уже есть, например в asset_cache."""
+        future: Future = Future()
+        future.set_result(value)
+        handle = AssetHandle(key, future)
+        handle.finalize()
+        return handle
+
+    def image(self, path: str) -> AssetHandle:
+        """Декодирует изображение в фоне; в главном потоке оно переводится в формат дисплея
+        и кладётся в asset_cache, так что фабрики виджетов найдут его там без повторной загрузки."""
+        if ("image", path) in asset_cache:
+            return self.loaded(("image", path), asset_cache.get(("image", path)))
+        return self.task(
+            ("image", path),
+            lambda: pygame.image.load(path),
+            lambda surface: asset_cache.put(("image", path), to_display_format(surface))
+        )
+
+    def scaled(self, source: pygame.Surface, size: tuple[int, int]) -> AssetHandle:
+        """Сглаженно масштабирует source до size в фоне и кладёт результат туда, где его найдёт
+        AssetCache.scaled. Источник в формате дисплея даёт результат в нём же, так что главному
+        потоку остаётся только положить поверхность в кэш."""
+        size = tuple(size)
+        key = asset_cache.scaled_key(source, size)
+        if key in asset_cache:
+            return self.loaded(key, asset_cache.get(key))
+
+        def finalize(surface: pygame.Surface | None) -> None:
+            # Дескриптор поверхность не держит: из кэша она вытесняется как обычно.
+            if surface is None:
+                return
+            surface = to_display_format(surface)
+            if source.get_alpha() is not None and not source.get_flags() & pygame.SRCALPHA:
+                surface.set_alpha(source.get_alpha())
+            asset_cache.put(key, surface)
+
+        return self.task(
+            key, lambda: None if source.get_size() == size else pygame.transform.smoothscale(source, size), finalize
+        )
+
+    def sound(self, path: str) -> AssetHandle:
+        """Декодирует звук в фоне; требует инициализированный pygame.mixer."""
+        return self.task(("sound", path), lambda: pygame.mixer.Sound(path))
+
+    def task(
+            self,
+            key: Hashable,
+            work: Callable[[], Any],
+            finalize: Callable[[Any], Any] | None = None
+    ) -> AssetHandle:
+        """Ставит произвольную работу в фоновый поток, например прогрев атласа спрайтов."""
+        with self.__lock:
+            handle = self.__handles.get(key)
+            if handle is None:
+                if self.__executor is None:
+                    self.__executor = ThreadPoolExecutor(self.__workers, thread_name_prefix="assets")
+                handle = self.__handles[key] = AssetHandle(key, self.__executor.submit(work), finalize)
+                self.__waiting.append(handle)
+                self.__submitted += 1
+        return handle
+
+    def get(self, key: Hashable) -> AssetHandle | None:
+        """Дескриптор ресурса, который ещё не доведён pump()."""
+        return self.__handles.get(key)
+
+    def pump(self, limit: int | None = None) -> int:
+        """Доводит до готовности декодированные ресурсы; не больше limit за вызов. Возвращает их число."""
+        finished = 0
+        for handle in list(self.__waiting):
+            if limit is not None and finished >= limit:
+                break
+            if not handle.decoded:
+                continue
+            handle.finalize()
+            with self.__lock:
+                self.__waiting.remove(handle)
+                if self.__handles.get(handle.key) is handle:
+                    del self.__handles[handle.key]
+            finished += 1
+        return finished
+
+    @property
+    def total(self) -> int:
+        """Сколько работ поставлено в фон за всё время."""
+        return self.__submitted
+
+    @property
+    def done(self) -> int:
+        return self.total - len(self.__waiting)
+
+    @property
+    def progress(self) -> float:
+        """Доля готовых ресурсов от 0 до 1."""
+        return self.done / self.total if self.__submitted else 1.0
+
+    @property
+    def idle(self) -> bool:
+        return not self.__waiting
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait, cancel_futures=not wait)
+            self.__executor = None
+
+
+asset_cache: AssetCache = AssetCache()
+assets: AssetLoader = AssetLoader()
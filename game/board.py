@@ -0,0 +1,139 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Очки за линию растут квадратично с количеством линий, очищенных одним ходом.
+LINE_SCORE: int = 10
+
+
+@lru_cache(maxsize=None)
+def line_masks(width: int, height: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Возвращает битовые маски всех строк и столбцов поля."""
+    row = (1 << width) - 1
+    rows = tuple(row << (y * width) for y in range(height))
+    column = sum(1 << (y * width) for y in range(height))
+    columns = tuple(column << x for x in range(width))
+    return rows, columns
+
+
+class Piece:
+    """Фигура, скомпилированная в битовую маску для поля заданной ширины."""
+
+    __slots__ = ("cells", "width", "height", "mask", "size")
+
+    def __init__(self, cells: list[tuple[int, int]], board_width: int) -> None:
+        min_x = min(x for x, _ in cells)
+        min_y = min(y for _, y in cells)
+        self.cells: tuple[tuple[int, int], ...] = tuple(sorted((x - min_x, y - min_y) for x, y in cells))
+        self.width: int = max(x for x, _ in self.cells) + 1
+        self.height: int = max(y for _, y in self.cells) + 1
+        self.mask: int = sum(1 << (y * board_width + x) for x, y in self.cells)
+        self.size: int = len(self.cells)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.cells)})"
+
+
+class Board:
+    """Игровое поле в виде упакованного целочисленного битборда: бит y * width + x — клетка (x, y)."""
+
+    __slots__ = ("width", "height", "bits", "score", "_rows", "_columns")
+
+    def __init__(self, width: int = 8, height: int = 8, bits: int = 0, score: int = 0) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.bits: int = bits
+        self.score: int = score
+        self._rows, self._columns = line_masks(width, height)
+
+    def piece(self, cells: list[tuple[int, int]]) -> Piece:
+        """Компилирует фигуру из вывода ShapeImageGenerator.parse_input под ширину поля."""
+        return Piece(cells, self.width)
+
+    def can_place(self, piece: Piece, x: int, y: int) -> bool:
+        """Проверяет, помещается ли фигура в позицию (x, y) левым верхним углом."""
+        if x < 0 or y < 0 or x + piece.width > self.width or y + piece.height > self.height:
+            return False
+        return not (piece.mask << (y * self.width + x)) & self.bits
+
+    def place(self, piece: Piece, x: int, y: int) -> int:
+        """Ставит фигуру, очищает заполненные линии и возвращает их количество."""
+        if not self.can_place(piece, x, y):
+            raise ValueError(f"{piece!r} cannot be placed at {(x, y)}.")
+        self.bits |= piece.mask << (y * self.width + x)
+        # Заполниться могли только строки и столбцы, которые задела фигура.
+        rows = [mask for mask in self._rows[y:y + piece.height] if self.bits & mask == mask]
+        columns = [mask for mask in self._columns[x:x + piece.width] if self.bits & mask == mask]
+        lines = len(rows) + len(columns)
+        if lines:
+            cleared = 0
+            for mask in rows + columns:
+                cleared |= mask
+            self.bits &= ~cleared
+        self.score += piece.size + LINE_SCORE * lines * lines
+        return lines
+
+    def completed(self, piece: Piece, x: int, y: int) -> tuple[list[int], list[int]]:
+        """Индексы строк и столбцов, которые заполнит фигура в (x, y), как их очистил бы place; поле не меняется."""
+        bits = self.bits | piece.mask << (y * self.width + x)
+        rows = [index for index in range(y, y + piece.height) if bits & self._rows[index] == self._rows[index]]
+        columns = [
+            index for index in range(x, x + piece.width) if bits & self._columns[index] == self._columns[index]
+        ]
+        return rows, columns
+
+    def full_lines(self) -> tuple[list[int], list[int]]:
+        """Возвращает индексы заполненных строк и столбцов."""
+        rows = [y for y, mask in enumerate(self._rows) if self.bits & mask == mask]
+        columns = [x for x, mask in enumerate(self._columns) if self.bits & mask == mask]
+        return rows, columns
+
+    def clear_lines(self) -> int:
+        """Очищает все заполненные строки и столбцы и возвращает их количество."""
+        rows, columns = self.full_lines()
+        cleared = 0
+        for y in rows:
+            cleared |= self._rows[y]
+        for x in columns:
+            cleared |= self._columns[x]
+        self.bits &= ~cleared
+        return len(rows) + len(columns)
+
+    def is_empty(self) -> bool:
+        return not self.bits
+
+    def copy(self) -> "Board":
+        return Board(self.width, self.height, self.bits, self.score)
+
+    @property
+    def cells(self) -> "np.ndarray":
+        """Возвращает поле как массив bool формы (height, width)."""
+        import numpy as np
+
+        size = self.width * self.height
+        packed = np.frombuffer(self.bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, count=size, bitorder="little").astype(bool).reshape(self.height, self.width)
+
+    @classmethod
+    def from_cells(cls, cells: "np.ndarray", score: int = 0) -> "Board":
+        """Создаёт поле из массива bool формы (height, width)."""
+        import numpy as np
+
+        height, width = cells.shape
+        bits = int.from_bytes(np.packbits(cells.astype(bool).ravel(), bitorder="little").tobytes(), "little")
+        return cls(width, height, bits, score)
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        x, y = cell
+        return bool(self.bits >> (y * self.width + x) & 1)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self.width, self.height, self.bits) == (other.width, other.height, other.bits)
+
+    def __repr__(self) -> str:
+        rows = ("".join("o" if (x, y) in self else "." for x in range(self.width)) for y in range(self.height))
+        return f"{self.__class__.__name__}({self.width}x{self.height}, score={self.score})\n" + "\n".join(rows)
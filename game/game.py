@@ -1,10 +1,24 @@
+import atexit
 import pygame
+from argparse import ArgumentParser
 from os import environ
 from settings import settings
+from .assets import asset_cache
+from .profiler import profiler
 from .scenes.menu import menu
 
 
-def main():
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(description='BlockPad')
+    parser.add_argument('--profile', action='store_true', help='collect frame timings from the start (F3 shows them)')
+    parser.add_argument('--trace', help='write a Chrome trace (.json) or CSV (.csv) of the session on exit')
+    args = parser.parse_args(argv)
+    if args.profile or args.trace:
+        profiler.enable()
+    if args.trace:
+        atexit.register(profiler.export, args.trace)
+
     environ['SDL_VIDEO_CENTERED'] = '1'
+    asset_cache.budget = settings.asset_cache_budget
     clock: pygame.time.Clock = pygame.time.Clock()
     menu(settings, clock)
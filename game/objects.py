@@ -1,8 +1,13 @@
 import pygame
-from dynaconf import settings
+from settings import settings
+from .shapes import parse_shape
+from .tint import label_surface, shape_labels, tint_into
 
 
 class DrawImage:
+    # Готовые плитки блоков по (палитра, block_size, padding, border_thickness)
+    _tiles: dict[tuple, pygame.Surface] = {}
+
     @staticmethod
     def _draw_shadows(
             surface: pygame.Surface,
@@ -40,7 +45,7 @@ class DrawImage:
             (inner_rect.x + block_size, inner_rect.y + block_size),
         ])
 
-    def draw_3d_block(
+    def _render_3d_block(
             self,
             surface: pygame.Surface,
             x: int,
@@ -50,7 +55,7 @@ class DrawImage:
             padding: int,
             border_thickness: int
     ) -> None:
-        """Рисует 3D-блок с тенями."""
+        """Рисует 3D-блок с тенями примитивами pygame.draw."""
         main_color, top_highlight, left_shadow, right_shadow, bottom_shadow = colors
         outer_rect = pygame.Rect(x, y, block_size, block_size)
         pygame.draw.rect(surface, (255, 255, 255), outer_rect)
@@ -59,6 +64,51 @@ class DrawImage:
         self._draw_shadows(surface, inner_rect, padding, block_size, top_highlight, left_shadow, right_shadow,
                            bottom_shadow)
 
+    def block_tile(
+            self,
+            colors: tuple[tuple[int, int, int], ...],
+            block_size: int,
+            padding: int,
+            border_thickness: int
+    ) -> pygame.Surface:
+        """Возвращает заранее отрисованный 3D-блок, рисуя его при первом запросе."""
+        key = (tuple(tuple(color) for color in colors), block_size, padding, border_thickness)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+            tile.fill((0, 0, 0, 0))
+            self._render_3d_block(tile, 0, 0, key[0], block_size, padding, border_thickness)
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert_alpha()
+            self._tiles[key] = tile
+        return tile
+
+    def draw_3d_block(
+            self,
+            surface: pygame.Surface,
+            x: int,
+            y: int,
+            colors: tuple[tuple[int, int, int], ...],
+            block_size: int,
+            padding: int,
+            border_thickness: int
+    ) -> None:
+        """Рисует 3D-блок с тенями."""
+        surface.blit(self.block_tile(colors, block_size, padding, border_thickness), (x, y))
+
+    def draw_blocks(
+            self,
+            surface: pygame.Surface,
+            positions: list[tuple[int, int]],
+            colors: tuple[tuple[int, int, int], ...],
+            block_size: int,
+            padding: int,
+            border_thickness: int
+    ) -> None:
+        """Рисует блоки в заданных позициях одним пакетным вызовом Surface.blits."""
+        tile = self.block_tile(colors, block_size, padding, border_thickness)
+        surface.blits([(tile, position) for position in positions], False)
+
     def draw_shape(
             self,
             shape: list[tuple[int, int]],
@@ -71,16 +121,14 @@ class DrawImage:
         width, height, min_x, min_y = self.calculate_screen_size(shape, block_size)
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         surface.fill((0, 0, 0, 0))
-        for (x, y) in shape:
-            self.draw_3d_block(
-                surface,
-                (x - min_x) * block_size,
-                (y - min_y) * block_size,
-                colors,
-                block_size,
-                padding,
-                border_thickness
-            )
+        self.draw_blocks(
+            surface,
+            [((x - min_x) * block_size, (y - min_y) * block_size) for (x, y) in shape],
+            colors,
+            block_size,
+            padding,
+            border_thickness
+        )
         return surface
 
     @staticmethod
@@ -98,7 +146,98 @@ class DrawImage:
         return width, height, min_x, min_y
 
 
+class ShapeAtlas:
+    """Атлас спрайтов фигур: строка на цвет, все строки в одной поверхности.
+
+    Фигуры рисуются один раз в маску меток строки; строка цвета получается из неё раскраской палитрой.
+    Раскраска строки дешевле чтения PNG, поэтому на диске атлас не хранится."""
+
+    def __init__(
+            self,
+            colors: dict[str, tuple[tuple[int, int, int], ...]],
+            shapes: dict[str, list[tuple[int, int]]],
+            block_size: int,
+            padding: int,
+            border_thickness: int
+    ) -> None:
+        self.__colors = colors
+        self.__shapes = shapes
+        self.__block_size = block_size
+        self.__padding = padding
+        self.__border_thickness = border_thickness
+        self.__rects: dict[tuple[str, str], pygame.Rect] = {}
+        self.__rows: dict[str, pygame.Rect] = {}
+        self.__sprites: dict[tuple[str, str], pygame.Surface] = {}
+        self.__labels: pygame.Surface | None = None
+        self.__ready: set[str] = set()
+        # Раскладка: строка на цвет, столбец на фигуру.
+        sizes = {key: DrawImage.calculate_screen_size(shape, block_size)[:2] for key, shape in shapes.items()}
+        row_height = max((height for _, height in sizes.values()), default=0)
+        width = sum(width for width, _ in sizes.values())
+        for row, color_name in enumerate(colors):
+            self.__rows[color_name] = pygame.Rect(0, row * row_height, width, row_height)
+            x = 0
+            for key, (shape_width, shape_height) in sizes.items():
+                self.__rects[(color_name, key)] = pygame.Rect(x, row * row_height, shape_width, shape_height)
+                x += shape_width
+        self.surface = pygame.Surface((max(width, 1), max(row_height * len(colors), 1)), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+
+    def rect(self, color_name: str, shape: str) -> pygame.Rect:
+        """Возвращает область спрайта в атласе, отрисовывая его при первом запросе."""
+        self.sprite(color_name, shape)
+        return self.__rects[(color_name, shape)]
+
+    def sprite(self, color_name: str, shape: str) -> pygame.Surface:
+        """Возвращает спрайт фигуры как подповерхность атласа."""
+        key = (color_name, shape)
+        sprite = self.__sprites.get(key)
+        if sprite is None:
+            self.__render_row(color_name)
+            sprite = self.__sprites[key]
+        return sprite
+
+    def render_all(self) -> None:
+        """Отрисовывает все ещё не готовые строки."""
+        for color_name in self.__colors:
+            if color_name not in self.__ready:
+                self.__render_row(color_name)
+
+    @property
+    def labels(self) -> pygame.Surface:
+        """Маска меток одной строки атласа: общая для всех цветов."""
+        if self.__labels is None:
+            row = next(iter(self.__rows.values()))
+            labels = label_surface(row.size)
+            for (color_name, shape), rect in self.__rects.items():
+                if rect.y == row.y:
+                    shape_labels(
+                        self.__shapes[shape], self.__block_size, self.__padding, self.__border_thickness, labels,
+                        (rect.x, 0)
+                    )
+            self.__labels = labels
+        return self.__labels
+
+    def __render_row(self, color_name: str) -> None:
+        """Раскрашивает маску строки палитрой цвета."""
+        tint_into(self.surface, self.__rows[color_name].topleft, self.labels, self.__colors[color_name])
+        self.__add_row_sprites(color_name)
+
+    def __add_row_sprites(self, color_name: str) -> None:
+        self.__ready.add(color_name)
+        for shape in self.__shapes:
+            self.__sprites[(color_name, shape)] = self.surface.subsurface(self.__rects[(color_name, shape)])
+
+    def __len__(self) -> int:
+        return len(self.__sprites)
+
+
 class ShapeImageGenerator:
+    # Атласы общие для всех генераторов с одинаковыми цветами, фигурами и размерами блока.
+    _atlases: dict[tuple, ShapeAtlas] = {}
+
     def __init__(
             self,
             block_size: int = 43,
@@ -108,42 +247,52 @@ class ShapeImageGenerator:
         self.__block_size = block_size
         self.__padding = padding
         self.__border_thickness = border_thickness
-        # Используем settings.colors напрямую
-        self.COLORS: dict[str, list[tuple[int, int, int]]] = {
-            key: [tuple(color) for color in value] for key, value in settings.colors.items()
+        self.COLORS: dict[str, tuple[tuple[int, int, int], ...]] = {
+            key: tuple(tuple(color) for color in value) for key, value in settings.colors.items()
         }
         self.input_strings: list[str] = list(settings.shapes)
+        # Парсим фигуры один раз и сортируем по возрастанию количества блоков
+        self.shapes: dict[str, list[tuple[int, int]]] = dict(sorted(
+            ((input_string, self.parse_input(input_string)) for input_string in self.input_strings),
+            key=lambda item: len(item[1])
+        ))
         self.drawer = DrawImage()
 
     @property
-    def images(self) -> dict[str, list[pygame.Surface]]:
-        """Генерирует изображения фигур и возвращает их."""
-        images: dict[str, list[pygame.Surface]] = {}
-        for color_name, colors in self.COLORS.items():
-            surfaces: list[pygame.Surface] = []
-            shapes_with_surfaces: list[tuple[int, pygame.Surface]] = []
-
-            for input_string in self.input_strings:
-                shape = self.parse_input(input_string)
-                surface = self.drawer.draw_shape(shape, colors, self.__block_size, self.__padding,
-                                                 self.__border_thickness)
-                shapes_with_surfaces.append((len(shape), surface))
+    def key(self) -> tuple:
+        """Всё, от чего зависят спрайты атласа: цвета, фигуры и размеры блока."""
+        return (
+            tuple(self.COLORS.items()),
+            tuple(self.shapes),
+            self.__block_size,
+            self.__padding,
+            self.__border_thickness
+        )
 
-            # Сортируем по возрастанию количества блоков
-            shapes_with_surfaces.sort(key=lambda x: x[0])
+    @property
+    def atlas(self) -> ShapeAtlas:
+        key = self.key
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = ShapeAtlas(
+                self.COLORS, self.shapes, self.__block_size, self.__padding, self.__border_thickness
+            )
+        return atlas
 
-            # Извлекаем только поверхности
-            surfaces = [surface for _, surface in shapes_with_surfaces]
-            images[color_name] = surfaces
+    def sprite(self, color_name: str, shape: str) -> pygame.Surface:
+        """Возвращает спрайт одной фигуры заданного цвета."""
+        return self.atlas.sprite(color_name, shape)
 
-        return images
+    @property
+    def images(self) -> dict[str, list[pygame.Surface]]:
+        """Возвращает изображения фигур по цветам, отсортированные по количеству блоков."""
+        atlas = self.atlas
+        return {
+            color_name: [atlas.sprite(color_name, shape) for shape in self.shapes]
+            for color_name in self.COLORS
+        }
 
     @staticmethod
     def parse_input(input_string: str) -> list[tuple[int, int]]:
         """Парсит входную строку и возвращает координаты фигуры."""
-        shape: list[tuple[int, int]] = []
-        for y, row in enumerate(input_string.split("\n")):
-            for x, char in enumerate(row):
-                if char == 'o':
-                    shape.append((x, y))
-        return shape
+        return parse_shape(input_string)
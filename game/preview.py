@@ -0,0 +1,70 @@
+from typing import NamedTuple
+
+from .board import Board
+from .shapes import Shape
+
+
+class Preview(NamedTuple):
+    """Ход под курсором: фигура, её левая верхняя клетка, можно ли её туда поставить
+    и какие строки и столбцы при этом очистятся."""
+
+    shape: Shape
+    cell: tuple[int, int]
+    legal: bool
+    rows: tuple[int, ...]
+    columns: tuple[int, ...]
+
+
+class PlacementPreview:
+    """Переводит курсор в клетку поля и считает предпросмотр хода.
+
+    Клетка находится делением, без перебора клеток. Допустимость и очищаемые линии
+    пересчитываются, только когда меняется клетка, фигура или поле, так что частые события
+    движения мыши внутри одной клетки ничего не стоят."""
+
+    __slots__ = ("board", "cell_size", "origin", "__key", "__preview")
+
+    def __init__(self, board: Board, cell_size: int, origin: tuple[int, int] = (0, 0)) -> None:
+        self.board: Board = board
+        self.cell_size: int = cell_size
+        # Экранные координаты левого верхнего угла поля.
+        self.origin: tuple[int, int] = origin
+        self.__key: tuple | None = None
+        self.__preview: Preview | None = None
+
+    @property
+    def preview(self) -> Preview | None:
+        return self.__preview
+
+    def cell(self, position: tuple[int, int], shape: Shape, grab: tuple[int, int]) -> tuple[int, int] | None:
+        """Клетка левого верхнего блока фигуры, которую держат за точку grab спрайта, или None,
+        если фигура целиком не помещается в поле. Фигура притягивается к ближайшей клетке."""
+        size = self.cell_size
+        x = (position[0] - grab[0] - self.origin[0] + size // 2) // size
+        y = (position[1] - grab[1] - self.origin[1] + size // 2) // size
+        if 0 <= x <= self.board.width - shape.width and 0 <= y <= self.board.height - shape.height:
+            return x, y
+        return None
+
+    def update(self, position: tuple[int, int], shape: Shape, grab: tuple[int, int]) -> bool:
+        """Обновляет предпросмотр для курсора; возвращает True, только если он изменился."""
+        cell = self.cell(position, shape, grab)
+        key = (cell, shape, self.board.bits)
+        if key == self.__key:
+            return False
+        self.__key = key
+        previous = self.__preview
+        if cell is None:
+            self.__preview = None
+        elif self.board.can_place(shape, *cell):
+            rows, columns = self.board.completed(shape, *cell)
+            self.__preview = Preview(shape, cell, True, tuple(rows), tuple(columns))
+        else:
+            self.__preview = Preview(shape, cell, False, (), ())
+        return self.__preview != previous
+
+    def clear(self) -> bool:
+        """Убирает предпросмотр, например когда фигуру отпустили; True, если он был."""
+        self.__key = None
+        previous, self.__preview = self.__preview, None
+        return previous is not None
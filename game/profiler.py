@@ -0,0 +1,137 @@
+import csv
+import json
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator
+
+# Сколько последних кадров хранится для FPS и гистограммы.
+FRAME_HISTORY: int = 600
+# Ограничение на количество событий трассировки, чтобы долгая сессия не съела память.
+TRACE_LIMIT: int = 1_000_000
+
+
+class Profiler:
+    """Покадровый профилировщик: секции цикла сцены, время отрисовки виджетов и количество blit.
+
+    Пока профилировщик выключен, каждая точка замера стоит одну проверку флага."""
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.frames: deque[float] = deque(maxlen=FRAME_HISTORY)
+        self.blits: int = 0
+        self.widgets: dict[str, float] = {}
+        self.last_frame: dict[str, float | int | dict[str, float]] = {}
+        self.trace: deque[tuple[str, str, float, float, dict]] = deque(maxlen=TRACE_LIMIT)
+        self.__origin: float = perf_counter()
+        self.__frame_start: float | None = None
+        self.__sections: dict[str, float] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.__frame_start = None
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self.__frame_start = perf_counter()
+        self.__sections = {}
+        self.widgets = {}
+        self.blits = 0
+
+    def end_frame(self) -> None:
+        if not self.enabled or self.__frame_start is None:
+            return
+        end = perf_counter()
+        duration = end - self.__frame_start
+        self.frames.append(duration)
+        self.last_frame = {
+            "frame": duration,
+            "blits": self.blits,
+            "sections": self.__sections,
+            "widgets": self.widgets,
+        }
+        self.trace.append(("frame", "frame", self.__frame_start, duration, {"blits": self.blits}))
+        self.__frame_start = None
+
+    def section(self, name: str):
+        """Контекстный менеджер для замера секции кадра (события, отрисовка, clock.tick)."""
+        if not self.enabled:
+            return nullcontext()
+        return self.__section(name)
+
+    @contextmanager
+    def __section(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - start
+            self.__sections[name] = self.__sections.get(name, 0.0) + duration
+            self.trace.append((name, "section", start, duration, {}))
+
+    def start(self) -> float:
+        """Возвращает отметку времени для widget(); без профилирования — 0."""
+        return perf_counter() if self.enabled else 0.0
+
+    def widget(self, widget: object, started: float, blits: int = 1) -> None:
+        """Записывает время отрисовки виджета, начатой в started, и число его blit."""
+        if not self.enabled:
+            return
+        duration = perf_counter() - started
+        name = repr(widget)
+        self.blits += blits
+        self.widgets[name] = self.widgets.get(name, 0.0) + duration
+        self.trace.append((name, "widget", started, duration, {"blits": blits}))
+
+    @property
+    def fps(self) -> float:
+        if not self.frames:
+            return 0.0
+        return len(self.frames) / sum(self.frames)
+
+    def histogram(self, bins: int, limit: float) -> list[int]:
+        """Распределение времени кадров по bins корзинам от 0 до limit секунд."""
+        counts = [0] * bins
+        for duration in self.frames:
+            counts[min(int(duration / limit * bins), bins - 1)] += 1
+        return counts
+
+    def export(self, path: str | Path) -> None:
+        """Сохраняет трассировку: .csv — таблица, иначе Chrome trace JSON (chrome://tracing, Perfetto)."""
+        path = Path(path)
+        if path.suffix == ".csv":
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(("name", "category", "start_us", "duration_us", "blits"))
+                for name, category, start, duration, args in self.trace:
+                    writer.writerow((
+                        name,
+                        category,
+                        round((start - self.__origin) * 1e6, 3),
+                        round(duration * 1e6, 3),
+                        args.get("blits", ""),
+                    ))
+            return
+        events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.__origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": args,
+            }
+            for name, category, start, duration, args in self.trace
+        ]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+profiler: Profiler = Profiler()
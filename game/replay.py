@@ -0,0 +1,171 @@
+import struct
+from array import array
+from hashlib import sha1
+from typing import Iterable, Iterator, NamedTuple
+
+from .rules import OFFERED, Game
+from .shapes import Shape, ShapeRegistry
+
+MAGIC: bytes = b"BP"
+VERSION: int = 2
+# magic, версия, ширина, высота, отпечаток каталога фигур, зерно, счёт, линии, ходы, байт в битборде.
+HEADER: struct.Struct = struct.Struct("<2sBBB4sQIIIB")
+# Пределы полей записи: счёт, линии и ходы — uint32, фигура и клетка хода — по байту.
+MAX_COUNT: int = 0xFFFFFFFF
+MAX_SIDE: int = 0xFF
+MAX_CELLS: int = 0x100
+
+
+class ReplayError(ValueError):
+    """Запись повреждена или расходится с текущими правилами игры."""
+
+
+class Replay(NamedTuple):
+    """Партия: выданные фигуры, ходы и итог. Фигура — индекс в каталоге, клетка — y * width + x."""
+
+    seed: int
+    width: int
+    height: int
+    catalogue: bytes
+    deals: tuple[tuple[int, ...], ...]
+    moves: tuple[tuple[int, int], ...]
+    score: int
+    lines: int
+    bits: int
+
+
+def catalogue_digest(registry: ShapeRegistry) -> bytes:
+    """Отпечаток каталога: индексы фигур в записи имеют смысл только для того же shapes.json."""
+    return sha1("\0".join(shape.source for shape in registry).encode()).digest()[:4]
+
+
+def encode(replay: Replay) -> bytes:
+    """Упаковывает партию: заголовок, затем выдача из трёх байт и ходы по два байта.
+
+    Партия, не помещающаяся в поля записи, — ValueError с именем поля."""
+    for name, value, limit in (
+        ("score", replay.score, MAX_COUNT),
+        ("lines", replay.lines, MAX_COUNT),
+        ("moves", len(replay.moves), MAX_COUNT),
+        ("width", replay.width, MAX_SIDE),
+        ("height", replay.height, MAX_SIDE),
+        ("board cells", replay.width * replay.height, MAX_CELLS),
+    ):
+        if not 0 <= value <= limit:
+            raise ValueError(f"Cannot record a game with {name} = {value}, the replay format allows at most {limit}.")
+    board_bytes = (replay.width * replay.height + 7) // 8
+    body = array("B")
+    for deal, start in zip(replay.deals, range(0, len(replay.moves) + 1, OFFERED)):
+        body.extend(deal)
+        for shape, cell in replay.moves[start:start + OFFERED]:
+            body.append(shape)
+            body.append(cell)
+    return b"".join((
+        HEADER.pack(
+            MAGIC, VERSION, replay.width, replay.height, replay.catalogue, replay.seed, replay.score,
+            replay.lines, len(replay.moves), board_bytes
+        ),
+        replay.bits.to_bytes(board_bytes, "little"),
+        body.tobytes(),
+    ))
+
+
+def decode(data: bytes | memoryview, offset: int = 0) -> tuple[Replay, int]:
+    """Распаковывает партию, начинающуюся с offset, и возвращает её вместе со смещением следующей."""
+    try:
+        magic, version, width, height, catalogue, seed, score, lines, count, board_bytes = HEADER.unpack_from(
+            data, offset
+        )
+    except struct.error as error:
+        raise ReplayError(f"Truncated replay header at byte {offset}.") from error
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError(f"Not a version {VERSION} replay at byte {offset}.")
+    offset += HEADER.size
+    bits = int.from_bytes(data[offset:offset + board_bytes], "little")
+    offset += board_bytes
+    # Выдача перед каждой тройкой ходов и ещё одна после последней полной тройки.
+    size = OFFERED * (count // OFFERED + 1) + 2 * count
+    body = bytes(data[offset:offset + size])
+    if len(body) != size:
+        raise ReplayError(f"Truncated replay body at byte {offset}.")
+    deals: list[tuple[int, ...]] = []
+    moves: list[tuple[int, int]] = []
+    position = 0
+    for _ in range(count // OFFERED + 1):
+        deals.append(tuple(body[position:position + OFFERED]))
+        position += OFFERED
+        turn = min(OFFERED, count - len(moves))
+        moves.extend(zip(body[position:position + 2 * turn:2], body[position + 1:position + 2 * turn:2]))
+        position += 2 * turn
+    return Replay(seed, width, height, catalogue, tuple(deals), tuple(moves), score, lines, bits), offset + size
+
+
+def iter_replays(data: bytes) -> Iterator[Replay]:
+    """Перебирает партии из корпуса — склеенных подряд записей."""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        replay, offset = decode(view, offset)
+        yield replay
+
+
+class Recorder:
+    """Ведёт партию и одновременно записывает выданные фигуры и ходы."""
+
+    def __init__(self, game: Game) -> None:
+        self.game: Game = game
+        self.__index: dict[Shape, int] = {shape: index for index, shape in enumerate(game.registry)}
+        self.__deals: list[tuple[int, ...]] = [self.__deal()]
+        self.__moves: list[tuple[int, int]] = []
+
+    def __deal(self) -> tuple[int, ...]:
+        return tuple(self.__index[shape] for shape in self.game.offered)
+
+    def play(self, shape: Shape, x: int, y: int) -> int:
+        last = len(self.game.offered) == 1
+        lines = self.game.play(shape, x, y)
+        self.__moves.append((self.__index[shape], y * self.game.board.width + x))
+        if last:
+            self.__deals.append(self.__deal())
+        return lines
+
+    @property
+    def replay(self) -> Replay:
+        board = self.game.board
+        return Replay(
+            self.game.seed, board.width, board.height, catalogue_digest(self.game.registry), tuple(self.__deals),
+            tuple(self.__moves), board.score, self.game.lines, board.bits
+        )
+
+
+def play(replay: Replay, registry: ShapeRegistry) -> Game:
+    """Проигрывает запись на движке поля без отрисовки и проверяет итог; при расхождении — ReplayError."""
+    if catalogue_digest(registry) != replay.catalogue:
+        raise ReplayError("The replay was recorded with a different shape catalogue.")
+    if (registry.width, registry.height) != (replay.width, replay.height):
+        raise ReplayError(f"The replay was recorded on a {replay.width}x{replay.height} board.")
+    shapes: list[Shape] = list(registry)
+    game = Game(registry, replay.seed)
+    for turn, deal in enumerate(replay.deals):
+        # Записанная выдача заменяет генератор: так проигрываются и партии с весами фигур.
+        try:
+            game.offered = [shapes[index] for index in deal]
+        except IndexError:
+            raise ReplayError(f"Deal {turn} refers to a shape outside the catalogue: {deal}.") from None
+        for number, (index, cell) in enumerate(replay.moves[turn * OFFERED:(turn + 1) * OFFERED], turn * OFFERED):
+            y, x = divmod(cell, replay.width)
+            try:
+                game.play(shapes[index], x, y)
+            except (ValueError, IndexError) as error:
+                raise ReplayError(f"Move {number} diverges: {error}") from error
+    if (game.board.bits, game.score, game.lines) != (replay.bits, replay.score, replay.lines):
+        raise ReplayError(
+            f"Final state diverges: got score {game.score}, lines {game.lines}, board {game.board.bits:#x}; "
+            f"recorded {replay.score}, {replay.lines}, {replay.bits:#x}."
+        )
+    return game
+
+
+def verify(replays: Iterable[Replay], registry: ShapeRegistry) -> int:
+    """Проигрывает все записи и возвращает число сделанных ходов."""
+    return sum(play(replay, registry).moves for replay in replays)
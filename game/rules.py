@@ -0,0 +1,79 @@
+from hashlib import sha1
+from random import Random
+from typing import Sequence
+
+from .board import Board
+from .shapes import Shape, ShapeRegistry
+
+# Сколько фигур предлагается игроку за раз.
+OFFERED: int = 3
+
+
+def game_seed(seed: int, index: int) -> int:
+    """Выводит 64-битное зерно партии index из общего зерна; не зависит от порядка и числа процессов."""
+    return int.from_bytes(sha1(f"{seed}:{index}".encode()).digest()[:8], "little")
+
+
+class Game:
+    """Партия без отрисовки: поле, генератор фигур и предложенные фигуры.
+
+    Игрок ставит предложенные фигуры в любом порядке; когда поставлены все, выдаются новые.
+    Партия окончена, когда ни одну из оставшихся фигур нельзя поставить."""
+
+    __slots__ = ("registry", "board", "seed", "random", "offered", "moves", "lines", "_shapes", "_weights")
+
+    def __init__(self, registry: ShapeRegistry, seed: int = 0, weights: Sequence[float] | None = None) -> None:
+        self.registry: ShapeRegistry = registry
+        self.board: Board = registry.board()
+        self.seed: int = seed
+        self.random: Random = Random(seed)
+        self.offered: list[Shape] = []
+        self.moves: int = 0
+        self.lines: int = 0
+        self._shapes: list[Shape] = list(registry)
+        self._weights: list[float] | None = None if weights is None else list(weights)
+        self.deal()
+
+    def deal(self) -> list[Shape]:
+        """Выдаёт новые фигуры с учётом весов."""
+        self.offered = self.random.choices(self._shapes, self._weights, k=OFFERED)
+        return self.offered
+
+    def use_registry(self, registry: ShapeRegistry) -> None:
+        """Переносит партию на изменённый каталог фигур: поле и счёт сохраняются,
+        а если какой-то из предложенных фигур в каталоге больше нет, фигуры выдаются заново."""
+        if (registry.width, registry.height) != (self.registry.width, self.registry.height):
+            raise ValueError(
+                f"Cannot move a {self.registry.width}x{self.registry.height} game to another board size."
+            )
+        self.registry = registry
+        self._shapes = list(registry)
+        if self._weights is not None and len(self._weights) != len(self._shapes):
+            self._weights = None
+        if all(shape.source in registry.shapes for shape in self.offered):
+            self.offered = [registry[shape.source] for shape in self.offered]
+        else:
+            self.deal()
+
+    @property
+    def over(self) -> bool:
+        return not self.registry.can_continue(self.board, self.offered)
+
+    def play(self, shape: Shape, x: int, y: int) -> int:
+        """Ставит предложенную фигуру и возвращает количество очищенных линий."""
+        if shape not in self.offered:
+            raise ValueError(f"{shape!r} is not offered.")
+        lines = self.board.place(shape, x, y)
+        self.offered.remove(shape)
+        self.moves += 1
+        self.lines += lines
+        if not self.offered:
+            self.deal()
+        return lines
+
+    @property
+    def score(self) -> int:
+        return self.board.score
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(seed={self.seed}, moves={self.moves}, score={self.score})"
@@ -0,0 +1,236 @@
+from schemas.config import Config
+from settings import SettingsWatcher
+from game.assets import AssetHandle
+from game.objects import ShapeImageGenerator
+from game.profiler import profiler
+from game.shapes import shape_registry
+from time import perf_counter
+from typing import Callable, Dict, List, Set, Tuple
+from weakref import WeakSet
+import pygame
+
+PACING: Tuple[str, ...] = ('busy_loop', 'sleep', 'vsync')
+# Частота логики не зависит от частоты кадров.
+TICK_RATE: int = 60
+# После долгого кадра логика догоняет не больше стольких шагов, остальное время отбрасывается.
+MAX_STEPS: int = 5
+# Сколько миллисекунд простаивающая сцена ждёт события, прежде чем проверить себя снова.
+IDLE_TIMEOUT: int = 500
+# Частота кадров, пока окно не в фокусе, а сцене есть что рисовать.
+UNFOCUSED_FPS: int = 10
+
+
+def set_mode(size: Tuple[int, int], pacing: str) -> pygame.Surface:
+    # Вертикальная синхронизация доступна не на всех драйверах; без неё кадр ограничивается таймером.
+    if pacing == 'vsync':
+        try:
+            return pygame.display.set_mode(size, pygame.RESIZABLE, vsync=1)
+        except pygame.error:
+            pass
+    return pygame.display.set_mode(size, pygame.RESIZABLE)
+
+
+def resize_window(configs: Config, size: Tuple[int, int]) -> pygame.Surface:
+    minimal_width, minimal_height = configs.window.minimal_size
+    size = (max(size[0], minimal_width), max(size[1], minimal_height))
+    screen: pygame.Surface = pygame.display.get_surface()
+    # После VIDEORESIZE pygame сам меняет размер поверхности окна, set_mode нужен только для ESC
+    # и для окна меньше минимального.
+    if screen.get_size() != size:
+        screen = set_mode(size, configs.game.pacing)
+    return screen
+
+
+class Scene:
+    """Сцена для SceneLoop: обработка событий, логика с фиксированным шагом и отрисовка грязных областей."""
+
+    def __init__(self, screen: pygame.Surface, manager: 'SceneManager | None' = None):
+        self.screen: pygame.Surface = screen
+        self.manager: SceneManager | None = manager
+        self.running: bool = True
+        self.next: 'Scene | None' = None
+
+    @property
+    def idle(self) -> bool:
+        """Сцене нечего обновлять и рисовать до следующего события: цикл ждёт его, не тратя CPU."""
+        return True
+
+    def preload(self) -> List[AssetHandle]:
+        """Ставит в фоновый поток всё, что нужно для входа в сцену, и возвращает дескрипторы.
+        Вызывается заранее, пока крутится другая сцена, и может вызываться повторно: работа,
+        которая уже стоит в очереди, не дублируется, а ставится то, что стало возможным."""
+        return []
+
+    def enter(self) -> None:
+        """Вызывается, когда цикл начинает крутить сцену."""
+
+    def handle(self, event: pygame.event.Event) -> None:
+        pass
+
+    def update(self, step: float) -> None:
+        pass
+
+    def reload(self, changes: Set[str]) -> None:
+        """Настройки перечитаны; changes — пути изменённых полей вида 'window.size'.
+
+        Вызывается и у приостановленных сцен, поэтому должна лишь отмечать, что перестроить."""
+
+    def draw(self) -> List[pygame.Rect]:
+        return []
+
+    def finish(self, next_scene: 'Scene | None' = None) -> None:
+        """Останавливает сцену; цикл вернёт next_scene, а None означает выход из игры."""
+        self.running = False
+        self.next = next_scene
+
+    def switch(self, name: str) -> None:
+        """Останавливает сцену и передаёт управление сцене name из менеджера."""
+        self.finish(self.manager.get(name))
+
+
+class SceneLoop:
+    """Общий цикл сцен: события, логика с фиксированным шагом, отрисовка и выдерживание частоты кадров.
+
+    pacing: 'busy_loop' — точный tick_busy_loop, 'sleep' — tick со сном, 'vsync' — ожидание
+    вертикальной синхронизации в flip. Простаивающая сцена блокируется в pygame.event.wait.
+    С watcher цикл между кадрами подхватывает изменённые файлы настроек."""
+
+    def __init__(
+        self,
+        clock: pygame.time.Clock,
+        fps: int,
+        pacing: str = 'sleep',
+        tick_rate: int = TICK_RATE,
+        idle_timeout: int = IDLE_TIMEOUT,
+        watcher: SettingsWatcher | None = None
+    ):
+        if pacing not in PACING:
+            raise ValueError(f'Unknown pacing {pacing!r}, expected one of {PACING}.')
+        self.clock: pygame.time.Clock = clock
+        self.fps: int = fps
+        self.pacing: str = pacing
+        self.step: float = 1 / tick_rate
+        self.idle_timeout: int = idle_timeout
+        self.focused: bool = True
+        self.watcher: SettingsWatcher | None = watcher
+        # Все сцены, которые крутил цикл: приостановленные тоже узнают о новых настройках.
+        self.scenes: WeakSet[Scene] = WeakSet()
+
+    def events(self, wait: bool) -> List[pygame.event.Event]:
+        if not wait:
+            return pygame.event.get()
+        event: pygame.event.Event = pygame.event.wait(self.idle_timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event, *pygame.event.get()]
+
+    def present(self, rects: List[pygame.Rect]) -> None:
+        if not rects:
+            return
+        if self.pacing == 'vsync':
+            # Синхронизацию с экраном выполняет только flip.
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def tick(self) -> None:
+        fps: int = self.fps if self.focused else min(self.fps, UNFOCUSED_FPS)
+        if self.pacing == 'busy_loop':
+            self.clock.tick_busy_loop(fps)
+        else:
+            # При работающей vsync flip уже выдержал кадр и tick не ждёт; без неё tick ограничивает частоту.
+            self.clock.tick(fps)
+
+    def reload(self, changes: Set[str]) -> None:
+        """Сбрасывает только то, что выведено из изменённых настроек, и сообщает о них сценам."""
+        config: Config = self.watcher.config
+        if 'shapes' in changes:
+            shape_registry.cache_clear()
+        if changes & {'colors', 'shapes'}:
+            # Новые атласы рисуются по требованию; старые держат лишь виджеты, которые их ещё не отпустили.
+            ShapeImageGenerator._atlases.clear()
+        if 'game.FPS' in changes:
+            self.fps = config.game.FPS
+        if 'window.title' in changes:
+            pygame.display.set_caption(config.window.title)
+        for scene in list(self.scenes):
+            scene.reload(changes)
+
+    def run(self, scene: Scene) -> Scene | None:
+        """Крутит сцену, пока она не завершится, и возвращает следующую."""
+        scene.running = True
+        scene.next = None
+        self.scenes.add(scene)
+        scene.enter()
+        accumulator: float = 0.0
+        previous: float = perf_counter()
+        # Первый кадр сцены рисуется сразу, без ожидания событий.
+        entered: bool = True
+        while scene.running:
+            profiler.begin_frame()
+            with profiler.section('events'):
+                was_idle: bool = scene.idle and not entered
+                entered = False
+                for event in self.events(was_idle):
+                    if event.type == pygame.QUIT:
+                        scene.finish()
+                        break
+                    if event.type == pygame.WINDOWFOCUSLOST:
+                        self.focused = False
+                    elif event.type == pygame.WINDOWFOCUSGAINED:
+                        self.focused = True
+                    scene.handle(event)
+                if self.watcher is not None and scene.running:
+                    changes: Set[str] = self.watcher.poll()
+                    if changes:
+                        self.reload(changes)
+            with profiler.section('update'):
+                now: float = perf_counter()
+                # Время простоя логике не принадлежит: после ожидания событий отсчёт начинается заново.
+                accumulator = 0.0 if was_idle else min(accumulator + now - previous, MAX_STEPS * self.step)
+                previous = now
+                while accumulator >= self.step:
+                    scene.update(self.step)
+                    accumulator -= self.step
+            with profiler.section('draw'):
+                rects: List[pygame.Rect] = scene.draw() if scene.running else []
+                self.present(rects)
+            with profiler.section('tick'):
+                # Кадр после пробуждения тоже ограничивается, чтобы поток событий мыши не крутил цикл вхолостую.
+                if rects or not scene.idle:
+                    self.tick()
+            profiler.end_frame()
+        return scene.next
+
+
+class SceneManager:
+    """Сцены по имени поверх общего SceneLoop.
+
+    Сцена создаётся один раз и после приостановки остаётся в памяти со своим деревом виджетов и
+    состоянием: переключение туда и обратно — один кадр без загрузок и без set_mode. prepare()
+    заранее создаёт сцену и ставит её ресурсы в фон, пока крутится текущая."""
+
+    def __init__(self, loop: SceneLoop, factories: Dict[str, Callable[['SceneManager'], Scene]]):
+        self.loop: SceneLoop = loop
+        self.factories: Dict[str, Callable[[SceneManager], Scene]] = dict(factories)
+        self.__scenes: Dict[str, Scene] = {}
+
+    def get(self, name: str) -> Scene:
+        scene: Scene | None = self.__scenes.get(name)
+        if scene is None:
+            if name not in self.factories:
+                raise KeyError(f'Unknown scene {name!r}, expected one of {tuple(self.factories)}.')
+            scene = self.__scenes[name] = self.factories[name](self)
+            # Созданная заранее сцена тоже узнаёт о новых настройках, хотя цикл её ещё не крутил.
+            self.loop.scenes.add(scene)
+        return scene
+
+    def prepare(self, name: str) -> List[AssetHandle]:
+        """Создаёт сцену, если её ещё нет, и ставит её ресурсы в фон."""
+        return self.get(name).preload()
+
+    def run(self, name: str) -> None:
+        """Крутит сцены, начиная с name, пока какая-нибудь не завершится без следующей."""
+        scene: Scene | None = self.get(name)
+        while scene is not None:
+            scene = self.loop.run(scene)
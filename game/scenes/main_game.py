@@ -0,0 +1,250 @@
+from schemas.config import Config
+from game.assets import AssetHandle, assets
+from game.objects import ShapeImageGenerator
+from game.preview import PlacementPreview
+from game.profiler import profiler
+from game.rules import Game
+from game.shapes import shape_registry
+from game.text import GlyphAtlas, glyph_atlas
+from game.tint import Tinter
+from game.widgets.background import Background, BackgroundImage
+from game.widgets.base_widget import BaseWidget
+from game.widgets.board import BoardWidget
+from game.widgets.drag import DraggedShape, PlacementLayer
+from game.widgets.performance import PerformanceOverlay
+from game.widgets.text import NumberWidget, TextWidget
+from game.scenes.loop import Scene, SceneManager, resize_window
+from random import randrange
+from typing import List, Set, Tuple
+import pygame
+
+# Настройки, от которых зависит дерево виджетов партии.
+TREE_SETTINGS: Set[str] = {'colors', 'shapes'}
+SCORE_FONT_SIZE: int = 48
+SCORE_DIGITS: int = 7
+SCORE_GAP: int = 8
+# Призраки фигур под курсором: маски рисуются один раз на фигуру и переживают перестройку дерева.
+ghosts: Tinter = Tinter(BoardWidget.CELL, 4, 1)
+
+
+def preload(configs: Config, generator: ShapeImageGenerator) -> List[AssetHandle]:
+    # Атлас создаётся в главном потоке (его поверхность в формате дисплея), а рисуется в фоне.
+    atlas = generator.atlas
+    return [
+        assets.image(configs.background_game_path),
+        # В ключе — ключ атласа: после смены цветов или фигур новый атлас отрисовывается заново.
+        assets.task(('sprites', generator.key), atlas.render_all),
+    ]
+
+
+def new_game(seed: int) -> Game:
+    # Каталог фигур компилируется вместе с партией: в фоне, а не в кадре переключения.
+    return Game(shape_registry(), seed)
+
+
+def score_widgets(screen: pygame.Surface, board: BoardWidget, score: int) -> List[BaseWidget]:
+    """Подпись над левым краем поля и счёт над правым. Ставятся по полю при каждом размере окна:
+    поле не масштабируется, и пропорциональный перенос сдвинул бы текст на него."""
+    atlas: GlyphAtlas = glyph_atlas(SCORE_FONT_SIZE)
+    area: pygame.Rect = board.board_rect().move(board.coords)
+    box: pygame.Rect = pygame.Rect(0, 0, atlas.width('0') * SCORE_DIGITS, atlas.height)
+    box.bottomright = (area.right, area.top - SCORE_GAP)
+    return [
+        TextWidget(screen, (area.left, box.y), (area.width - box.width, box.height), 'Score', 36),
+        NumberWidget(screen, box.topleft, atlas, SCORE_DIGITS, score),
+    ]
+
+
+def build_game(
+    configs: Config,
+    screen: pygame.Surface,
+    game: Game,
+    generator: ShapeImageGenerator,
+    board: BoardWidget | None = None
+) -> BackgroundImage:
+    if board is None:
+        board = BoardWidget(screen, (0, 0), game, generator.atlas, generator.COLORS)
+    # Поле центрируется под полосой счёта, чтобы счёт не наезжал на него даже в минимальном окне.
+    header: int = glyph_atlas(SCORE_FONT_SIZE).height + SCORE_GAP
+    board = board.rescale((0, header), (screen.get_width(), max(screen.get_height() - header, board.height)))
+    area: pygame.Rect = board.board_rect().move(board.coords)
+    layer: PlacementLayer = PlacementLayer(screen, area.topleft, area.size, BoardWidget.CELL, ghosts)
+    children: List[BaseWidget] = [board, layer, *score_widgets(screen, board, game.score)]
+    return Background.create_background(screen, configs.background_game_path, (0, 0), screen.get_size(), children)
+
+
+class MainGame(Scene):
+    """Сцена партии: фон, поле и предложенные фигуры, которые перетаскивают на поле мышью.
+    ESC возвращает в меню."""
+
+    def __init__(self, configs: Config, screen: pygame.Surface, manager: SceneManager):
+        super().__init__(screen, manager)
+        self.configs: Config = configs
+        self.seed: int = randrange(1 << 63)
+        self.game: Game | None = None
+        self.tree: BackgroundImage | None = None
+        self.overlay: PerformanceOverlay = PerformanceOverlay(screen)
+        self.requested_size: Tuple[int, int] | None = None
+        # Изменённые настройки, по которым дерево ещё не перестроено.
+        self.stale: Set[str] = set()
+        # Перетаскивание: слот фигуры, точка спрайта, за которую её взяли, и последняя позиция курсора за кадр.
+        self.hand: DraggedShape = DraggedShape(screen)
+        self.dragged: int | None = None
+        self.grab: Tuple[int, int] = (0, 0)
+        self.pointer: Tuple[int, int] | None = None
+        self.preview: PlacementPreview | None = None
+        # Генератор спрайтов и дескрипторы подготовки живут, пока не сменились цвета или фигуры:
+        # меню готовит сцену каждый кадр простоя, а генератор при создании разбирает все фигуры.
+        self.generator: ShapeImageGenerator | None = None
+        self.handles: List[AssetHandle] | None = None
+        self.game_handle: AssetHandle | None = None
+
+    @property
+    def idle(self) -> bool:
+        return (
+            self.tree is not None
+            and self.requested_size is None
+            and not self.stale
+            and not self.overlay.visible
+        )
+
+    def sprites(self) -> ShapeImageGenerator:
+        if self.generator is None:
+            self.generator = ShapeImageGenerator()
+        return self.generator
+
+    def preload(self) -> List[AssetHandle]:
+        if self.handles is None:
+            self.handles = preload(self.configs, self.sprites())
+            if self.game is None:
+                self.game_handle = assets.task(('game', self.seed), lambda: new_game(self.seed))
+                self.handles.append(self.game_handle)
+        background: AssetHandle = self.handles[0]
+        if background.ready and self.tree is None:
+            # Фон уже в формате дисплея: его масштабирование под окно тоже уходит в фон.
+            return self.handles + [assets.scaled(background.result(), pygame.display.get_surface().get_size())]
+        return self.handles
+
+    def enter(self) -> None:
+        # Всё подготовлено, пока крутилось меню; result() лишь дожидается работы, если игрок оказался быстрее.
+        for handle in self.preload():
+            handle.result()
+        if self.game is None:
+            self.game = self.game_handle.result()
+        self.screen = self.hand.parent = pygame.display.get_surface()
+        if self.tree is None:
+            self.tree = build_game(self.configs, self.screen, self.game, self.sprites())
+        elif self.tree.size_of_surface != self.screen.get_size():
+            self.tree = build_game(self.configs, self.screen, self.game, self.sprites(), self.board)
+        self.tree.mark_dirty()
+
+    def handle(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.release(False)
+                self.switch('menu')
+            elif event.key == pygame.K_F3:
+                self.overlay.toggle()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.dragged is None:
+            self.pick(event.pos)
+        elif event.type == pygame.MOUSEMOTION and self.dragged is not None:
+            # Движения за кадр схлопываются: предпросмотр считается один раз, по последней позиции.
+            self.pointer = event.pos
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.dragged is not None:
+            self.follow(event.pos)
+            self.release(True)
+        elif event.type == pygame.VIDEORESIZE:
+            self.release(False)
+            self.requested_size = event.size
+        elif event.type == pygame.WINDOWEXPOSED and self.tree is not None:
+            self.tree.mark_dirty()
+
+    def reload(self, changes: Set[str]) -> None:
+        if self.running:
+            # Окно подгоняет только активная сцена; приостановленная подстроится под него при входе.
+            if 'window.size' in changes:
+                self.requested_size = tuple(self.configs.window.size)
+            elif 'window.minimal_size' in changes:
+                self.requested_size = self.screen.get_size()
+        if changes & TREE_SETTINGS:
+            # Новый атлас готовится заново; если сцена приостановлена, его нарисует фон, пока крутится меню.
+            self.generator = self.handles = None
+        self.stale |= changes & TREE_SETTINGS
+
+    @property
+    def board(self) -> BoardWidget:
+        return next(child for child in self.tree.child_surfaces if isinstance(child, BoardWidget))
+
+    @property
+    def layer(self) -> PlacementLayer:
+        return next(child for child in self.tree.child_surfaces if isinstance(child, PlacementLayer))
+
+    def pick(self, position: Tuple[int, int]) -> None:
+        """Берёт фигуру из слота под курсором; слот перерисовывается пустым."""
+        if self.tree is None:
+            return
+        board: BoardWidget = self.board
+        index: int | None = board.slot_at(position)
+        if index is None:
+            return
+        sprite, rect = board.slot_sprite(index)
+        self.dragged = index
+        self.grab = (position[0] - rect.x, position[1] - rect.y)
+        self.preview = PlacementPreview(self.game.board, board.CELL, board.board_rect().move(board.coords).topleft)
+        self.hand.pick(sprite, rect.topleft)
+        board.hidden = index
+        board.render()
+
+    def follow(self, position: Tuple[int, int]) -> None:
+        """Переносит фигуру за курсором; слой предпросмотра перерисовывается, только если сменилась клетка."""
+        self.hand.move((position[0] - self.grab[0], position[1] - self.grab[1]))
+        if self.preview.update(position, self.game.offered[self.dragged], self.grab):
+            board: BoardWidget = self.board
+            self.layer.show(self.preview.preview, board.colors[board.slot_color(self.dragged)])
+
+    def release(self, place: bool) -> None:
+        """Отпускает фигуру: ставит её, если place и позиция допустима, иначе возвращает в слот."""
+        if self.dragged is None:
+            return
+        preview = self.preview.preview
+        if place and preview is not None and preview.legal:
+            self.game.play(preview.shape, *preview.cell)
+        if self.preview.clear():
+            self.layer.show(None, ())
+        self.hand.drop()
+        self.dragged = self.preview = self.pointer = None
+        board: BoardWidget = self.board
+        board.hidden = None
+        board.render()
+
+    def rebuild(self) -> None:
+        """Переводит поле на новые цвета или фигуры; фон не трогается, перерисовывается только поле."""
+        if 'shapes' in self.stale:
+            # Предложенные фигуры могли смениться, поэтому перетаскиваемая возвращается в слот.
+            self.release(False)
+            self.game.use_registry(shape_registry())
+        self.stale.clear()
+        generator: ShapeImageGenerator = self.sprites()
+        self.board.use_atlas(generator.atlas, generator.COLORS)
+
+    def draw(self) -> List[pygame.Rect]:
+        if self.requested_size is not None:
+            with profiler.section('resize'):
+                self.screen = self.hand.parent = resize_window(self.configs, self.requested_size)
+                self.requested_size = None
+                self.tree = build_game(self.configs, self.screen, self.game, self.sprites(), self.board)
+                self.tree.mark_dirty()
+        if self.stale:
+            with profiler.section('reload'):
+                self.rebuild()
+        if self.pointer is not None:
+            with profiler.section('drag'):
+                self.follow(self.pointer)
+                self.pointer = None
+        for child in self.tree.child_surfaces:
+            if isinstance(child, NumberWidget):
+                # Одинаковое значение виджет пропускает: грязным он становится только после изменения счёта.
+                child.value = self.game.score
+        rects: List[pygame.Rect] = self.tree.draw()
+        rects += self.hand.draw_over(self.tree, rects)
+        return rects + self.overlay.draw_over(self.tree)
@@ -1,37 +1,171 @@
 from schemas.config import Config
 from game.widgets.base_widget import Widget, BaseWidget
 from game.widgets.background import Background, BackgroundImage
+from game.assets import AssetHandle, assets
+from game.profiler import profiler
+from game.widgets.performance import PerformanceOverlay
+from game.scenes import main_game
+from game.scenes.loop import Scene, SceneLoop, SceneManager, resize_window, set_mode
+from settings import SettingsWatcher, dotenv, settings_files
+from typing import Callable, Dict, List, Set, Tuple
 import pygame
 import sys
 
+# Фон меню, если картинка не загрузилась.
+FALLBACK_COLOR: Tuple[int, int, int] = (24, 24, 32)
 
-def menu(configs: Config, clock: pygame.time.Clock):
-    screen: pygame.Surface = pygame.display.set_mode(tuple(configs.window.size))
-    pygame.display.set_caption(configs.window.title)
-    icon: pygame.Surface = pygame.image.load(configs.icon)
-    pygame.display.set_icon(icon)
 
+def build_menu(
+    configs: Config, screen: pygame.Surface, background: pygame.Surface | None = None
+) -> BackgroundImage:
     menu_background: BackgroundImage = Background.create_background(
-        screen, configs.background_menu_path, (0, 0), screen.get_size()
+        screen, background or configs.background_menu_path, (0, 0), screen.get_size()
     )
     shadow: BaseWidget = Widget.create_widget(
-        menu_background.surface,
+        screen,
         pygame.Surface((menu_background.width // 2, menu_background.height)),
         (menu_background.width // 4, 0)
     )
     shadow.surface.fill(pygame.Color(128, 128, 128))
     shadow.surface.set_alpha(10)
     menu_background = menu_background.add_child_surfaces(shadow)
+    menu_background.composite = True
+    return menu_background
+
+
+def draw_loading(screen: pygame.Surface, progress: float) -> List[pygame.Rect]:
+    width, height = screen.get_size()
+    bar: pygame.Rect = pygame.Rect(0, 0, width // 3, 12)
+    bar.center = (width // 2, height // 2)
+    screen.fill((0, 0, 0))
+    pygame.draw.rect(screen, (80, 80, 80), bar, 1)
+    pygame.draw.rect(screen, (200, 200, 200), (bar.x, bar.y, round(bar.width * progress), bar.height))
+    return [screen.get_rect()]
+
+
+class MenuScene(Scene):
+    """Главное меню: пока фоновые ресурсы грузятся, рисует прогресс. Enter или щелчок начинают партию."""
+
+    def __init__(self, configs: Config, screen: pygame.Surface, manager: SceneManager):
+        super().__init__(screen, manager)
+        self.configs: Config = configs
+        # Всё тяжёлое декодируется в фоне, пока меню уже крутит цикл и рисует прогресс;
+        # заодно готовится и сцена партии.
+        self.icon: AssetHandle | None = assets.image(configs.icon)
+        self.background: AssetHandle = assets.image(configs.background_menu_path)
+        manager.prepare('game')
+        self.menu_background: BackgroundImage | None = None
+        self.loading_progress: float | None = None
+        self.overlay: PerformanceOverlay = PerformanceOverlay(screen)
+        self.requested_size: Tuple[int, int] | None = None
+
+    @property
+    def idle(self) -> bool:
+        return (
+            self.menu_background is not None
+            and assets.idle
+            and self.requested_size is None
+            and not self.overlay.visible
+        )
+
+    def enter(self) -> None:
+        self.screen = pygame.display.get_surface()
+        self.loading_progress = None
+        if self.menu_background is not None:
+            # Окно могло поменять размер, пока шла партия.
+            if self.menu_background.size_of_surface != self.screen.get_size():
+                self.menu_background = Background.resize(self.menu_background, self.screen.get_size())
+            self.menu_background.mark_dirty()
+
+    def start_game(self) -> None:
+        if self.menu_background is None or not assets.idle:
+            return
+        self.switch('game')
 
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    screen = pygame.display.set_mode(tuple(configs.window.minimal_size))
-                    menu_background = Background.resize(menu_background, screen.get_size())
-        menu_background.draw()
-        clock.tick(configs.game.FPS)
-        pygame.display.flip()
+    def handle(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.requested_size = tuple(self.configs.window.minimal_size)
+            elif event.key == pygame.K_F3:
+                self.overlay.toggle()
+            elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                self.start_game()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.start_game()
+        elif event.type == pygame.VIDEORESIZE:
+            # Пачка событий изменения размера за кадр схлопывается в одно — последнее.
+            self.requested_size = event.size
+        elif event.type == pygame.WINDOWEXPOSED:
+            self.loading_progress = None
+            if self.menu_background is not None:
+                self.menu_background.mark_dirty()
+
+    def update(self, step: float) -> None:
+        with profiler.section('assets'):
+            if assets.pump():
+                if self.icon is not None and (self.icon.ready or self.icon.failed):
+                    if self.icon.ready:
+                        pygame.display.set_icon(self.icon.result())
+                    else:
+                        print(f'Window icon not loaded: {self.icon.error}', file=sys.stderr)
+                    self.icon = None
+                if self.menu_background is None and (self.background.ready or self.background.failed):
+                    self.menu_background = build_menu(self.configs, self.screen, self.background_image())
+                if assets.idle:
+                    # Загруженное открывает следующие шаги подготовки, например масштабирование фона партии.
+                    self.manager.prepare('game')
+
+    def background_image(self) -> pygame.Surface:
+        # Без картинки меню остаётся рабочим: фон заливается цветом, а ошибка уходит в stderr.
+        if self.background.ready:
+            return self.background.result()
+        print(f'Menu background not loaded: {self.background.error}', file=sys.stderr)
+        surface: pygame.Surface = pygame.Surface(self.screen.get_size())
+        surface.fill(FALLBACK_COLOR)
+        return surface
+
+    def reload(self, changes: Set[str]) -> None:
+        if self.running:
+            if 'window.size' in changes:
+                self.requested_size = tuple(self.configs.window.size)
+            elif 'window.minimal_size' in changes:
+                self.requested_size = self.screen.get_size()
+
+    def draw(self) -> List[pygame.Rect]:
+        if self.requested_size is not None:
+            with profiler.section('resize'):
+                self.screen = resize_window(self.configs, self.requested_size)
+                self.requested_size = None
+                self.loading_progress = None
+                if self.menu_background is not None:
+                    self.menu_background = Background.resize(self.menu_background, self.screen.get_size())
+                    self.menu_background.mark_dirty()
+        if self.menu_background is not None:
+            rects: List[pygame.Rect] = self.menu_background.draw()
+            return rects + self.overlay.draw_over(self.menu_background)
+        if assets.progress != self.loading_progress:
+            self.loading_progress = assets.progress
+            return draw_loading(self.screen, self.loading_progress)
+        return []
+
+
+def scenes(configs: Config, screen: pygame.Surface) -> Dict[str, Callable[[SceneManager], Scene]]:
+    return {
+        'menu': lambda manager: MenuScene(configs, screen, manager),
+        'game': lambda manager: main_game.MainGame(configs, screen, manager),
+    }
+
+
+def menu(configs: Config, clock: pygame.time.Clock):
+    screen: pygame.Surface = set_mode(tuple(configs.window.size), configs.game.pacing)
+    pygame.display.set_caption(configs.window.title)
+    # Изменения config.json и shapes.json подхватываются на лету.
+    watcher: SettingsWatcher = SettingsWatcher(configs, settings_files(dotenv))
+    loop: SceneLoop = SceneLoop(clock, configs.game.FPS, configs.game.pacing, watcher=watcher)
+    # Сцены живут всё время игры: окно создаётся один раз, а переключение не перезагружает ресурсы.
+    manager: SceneManager = SceneManager(loop, scenes(configs, screen))
+    manager.run('menu')
+    watcher.close()
+    assets.shutdown(wait=False)
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,101 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from settings import settings
+from .board import Board, Piece
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def parse_shape(input_string: str) -> list[tuple[int, int]]:
+    """Парсит строку фигуры из shapes.json и возвращает координаты её блоков."""
+    shape: list[tuple[int, int]] = []
+    for y, row in enumerate(input_string.split("\n")):
+        for x, char in enumerate(row):
+            if char == "o":
+                shape.append((x, y))
+    return shape
+
+
+class Shape(Piece):
+    """Скомпилированная фигура: маска, массив и битовые маски всех допустимых позиций на поле."""
+
+    __slots__ = ("source", "_array", "placements")
+
+    def __init__(self, source: str, board_width: int, board_height: int) -> None:
+        super().__init__(parse_shape(source), board_width)
+        self.source: str = source
+        self._array: "np.ndarray | None" = None
+        # (x, y, маска) для каждой позиции, где фигура целиком помещается в поле.
+        self.placements: tuple[tuple[int, int, int], ...] = tuple(
+            (x, y, self.mask << (y * board_width + x))
+            for y in range(board_height - self.height + 1)
+            for x in range(board_width - self.width + 1)
+        )
+
+    @property
+    def array(self) -> "np.ndarray":
+        """Маска фигуры как неизменяемый массив bool формы (height, width)."""
+        if self._array is None:
+            import numpy as np
+
+            array = np.zeros((self.height, self.width), dtype=bool)
+            for x, y in self.cells:
+                array[y, x] = True
+            array.flags.writeable = False
+            self._array = array
+        return self._array
+
+    def fits(self, bits: int) -> bool:
+        """Проверяет, есть ли на поле хоть одна свободная позиция для фигуры."""
+        for _, _, mask in self.placements:
+            if not mask & bits:
+                return True
+        return False
+
+    def positions(self, bits: int) -> list[tuple[int, int]]:
+        """Возвращает все позиции, куда фигуру можно поставить."""
+        return [(x, y) for x, y, mask in self.placements if not mask & bits]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.source!r})"
+
+
+class ShapeRegistry:
+    """Все фигуры из shapes.json, скомпилированные один раз под размер поля."""
+
+    __slots__ = ("width", "height", "shapes", "_indices")
+
+    def __init__(self, sources: Iterable[str], width: int = 8, height: int = 8) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.shapes: dict[str, Shape] = {source: Shape(source, width, height) for source in sources}
+        self._indices: dict[Shape, int] = {shape: index for index, shape in enumerate(self.shapes.values())}
+
+    def board(self) -> Board:
+        """Создаёт пустое поле того же размера."""
+        return Board(self.width, self.height)
+
+    def can_continue(self, board: Board, shapes: Iterable[Shape]) -> bool:
+        """Проверяет, можно ли поставить хотя бы одну из фигур; иначе игра окончена."""
+        return any(shape.fits(board.bits) for shape in shapes)
+
+    def __getitem__(self, source: str) -> Shape:
+        return self.shapes[source]
+
+    def index(self, shape: Shape) -> int:
+        """Номер фигуры в каталоге, в порядке shapes.json."""
+        return self._indices[shape]
+
+    def __iter__(self) -> Iterator[Shape]:
+        return iter(self.shapes.values())
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+
+@lru_cache(maxsize=None)
+def shape_registry(width: int = 8, height: int = 8) -> ShapeRegistry:
+    """Возвращает реестр фигур из настроек, собранный один раз на размер поля."""
+    return ShapeRegistry(list(settings.shapes), width, height)
@@ -0,0 +1,231 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import permutations
+from os import cpu_count
+from time import time
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from .board import Board, line_masks
+from .shapes import Shape, ShapeRegistry
+
+if TYPE_CHECKING:
+    from ctypes import c_int64
+
+# Веса оценки позиции после хода.
+LINE_WEIGHT: float = 10.0
+FIT_WEIGHT: float = 1.0
+EMPTY_WEIGHT: float = 0.1
+ISOLATED_WEIGHT: float = 2.0
+# Как часто поиск сверяется с дедлайном (в листьях).
+DEADLINE_CHECK: int = 64
+# Сколько после дедлайна ждать, пока процессы пула вернут найденное.
+GRACE: float = 0.05
+
+# Номер последнего отменённого запроса, общий для процессов пула; в главном процессе — None.
+cancelled_generation: "c_int64 | None" = None
+
+
+class Move(NamedTuple):
+    shape: str
+    x: int
+    y: int
+
+
+class Solution(NamedTuple):
+    """Лучшая найденная последовательность ходов: сколько фигур поставлено, оценка и очищенные линии."""
+
+    moves: tuple[Move, ...]
+    score: float
+    lines: int
+
+    @property
+    def key(self) -> tuple[int, float]:
+        # Поставить больше фигур важнее любой оценки: иначе игра заканчивается.
+        return len(self.moves), self.score
+
+
+def init_worker(cancelled: "c_int64") -> None:
+    """Инициализатор процесса пула: запоминает общий счётчик отмен."""
+    global cancelled_generation
+    cancelled_generation = cancelled
+
+
+def stopped(deadline: float, generation: int) -> bool:
+    """Пора ли прекратить поиск: вышло время или запрос generation отменён."""
+    if time() > deadline:
+        return True
+    return generation > 0 and cancelled_generation is not None and cancelled_generation.value >= generation
+
+
+@lru_cache(maxsize=8)
+def registry(sources: tuple[str, ...], width: int, height: int) -> ShapeRegistry:
+    """Реестр фигур, собранный один раз на процесс."""
+    return ShapeRegistry(sources, width, height)
+
+
+def isolated_cells(board: Board) -> int:
+    """Считает пустые клетки без пустых соседей: в них не встанет ничего, кроме одиночного блока."""
+    full = (1 << board.width * board.height) - 1
+    empty = ~board.bits & full
+    _, columns = line_masks(board.width, board.height)
+    left_edge, right_edge = columns[0], columns[-1]
+    neighbours = (
+        (empty >> 1 & ~right_edge)
+        | (empty << 1 & ~left_edge)
+        | empty >> board.width
+        | empty << board.width
+    ) & full
+    return (empty & ~neighbours).bit_count()
+
+
+def evaluate(board: Board, lines: int, catalogue: Iterable[Shape]) -> float:
+    """Оценивает позицию: очищенные линии и открытость поля."""
+    fits = sum(shape.fits(board.bits) for shape in catalogue)
+    empty = board.width * board.height - board.bits.bit_count()
+    return LINE_WEIGHT * lines + FIT_WEIGHT * fits + EMPTY_WEIGHT * empty - ISOLATED_WEIGHT * isolated_cells(board)
+
+
+def search(
+        sources: tuple[str, ...],
+        width: int,
+        height: int,
+        bits: int,
+        order: tuple[str, ...],
+        first_moves: tuple[tuple[int, int], ...],
+        deadline: float,
+        generation: int = 0
+) -> Solution | None:
+    """Перебирает ходы для порядка фигур order, начиная с first_moves; выполняется в процессе пула.
+
+    generation — номер запроса: поиск останавливается, когда его отменят."""
+    if stopped(deadline, generation):
+        return None
+    catalogue = registry(sources, width, height)
+    shapes = [catalogue[source] for source in order]
+    best: Solution | None = None
+    leaves = 0
+
+    def descend(board: Board, depth: int, moves: tuple[Move, ...], lines: int) -> bool:
+        nonlocal best, leaves
+        positions = first_moves if depth == 0 else shapes[depth].positions(board.bits) if depth < len(shapes) else ()
+        placed = False
+        for x, y in positions:
+            if not board.can_place(shapes[depth], x, y):
+                continue
+            placed = True
+            child = board.copy()
+            cleared = child.place(shapes[depth], x, y)
+            if not descend(child, depth + 1, moves + (Move(order[depth], x, y),), lines + cleared):
+                return False
+        if not placed:
+            leaves += 1
+            solution = Solution(moves, evaluate(board, lines, catalogue), lines)
+            if best is None or solution.key > best.key:
+                best = solution
+            if leaves % DEADLINE_CHECK == 0 and stopped(deadline, generation):
+                return False
+        return True
+
+    descend(Board(width, height, bits), 0, (), 0)
+    return best
+
+
+class HintRequest:
+    """Асинхронный запрос подсказки: опрашивается из цикла отрисовки и может быть отменён."""
+
+    def __init__(
+            self,
+            futures: list[Future],
+            deadline: float,
+            cancelled: "c_int64 | None" = None,
+            generation: int = 0
+    ) -> None:
+        self.__futures = futures
+        self.__cancelled = cancelled
+        self.__generation = generation
+        self.deadline = deadline
+        self.cancelled: bool = False
+
+    @property
+    def done(self) -> bool:
+        if self.cancelled or all(future.done() for future in self.__futures):
+            return True
+        return time() >= self.deadline + GRACE
+
+    @property
+    def progress(self) -> float:
+        if not self.__futures:
+            return 1.0
+        return sum(future.done() for future in self.__futures) / len(self.__futures)
+
+    def result(self) -> Solution | None:
+        """Лучшее решение среди уже завершённых частей поиска; не блокирует."""
+        best: Solution | None = None
+        for future in self.__futures:
+            if not future.done() or future.cancelled() or future.exception() is not None:
+                continue
+            solution = future.result()
+            if solution is not None and (best is None or solution.key > best.key):
+                best = solution
+        return best
+
+    def cancel(self) -> None:
+        """Отменяет ещё не начатые части поиска и останавливает начатые.
+
+        Счётчик отмен общий, поэтому вместе с запросом останавливаются и все более ранние."""
+        self.cancelled = True
+        for future in self.__futures:
+            future.cancel()
+        if self.__cancelled is not None and self.__cancelled.value < self.__generation:
+            self.__cancelled.value = self.__generation
+
+
+class Solver:
+    """Поиск подсказок в пуле процессов, чтобы не нагружать поток отрисовки."""
+
+    def __init__(self, sources: Iterable[str], width: int = 8, height: int = 8, workers: int | None = None) -> None:
+        self.sources: tuple[str, ...] = tuple(sources)
+        self.width = width
+        self.height = height
+        self.__workers = workers or max(1, (cpu_count() or 2) - 1)
+        self.__executor: ProcessPoolExecutor | None = None
+        self.__cancelled: "c_int64 | None" = None
+        self.__generation: int = 0
+
+    def start(self) -> None:
+        """Запускает процессы пула заранее, чтобы первая подсказка не ждала их старта."""
+        if self.__executor is not None:
+            return
+        # spawn: процесс игры с pygame и фоновыми потоками нельзя безопасно форкать.
+        context = multiprocessing.get_context("spawn")
+        # Запись только из главного процесса, поэтому блокировка не нужна.
+        self.__cancelled = context.Value("q", 0, lock=False)
+        self.__executor = ProcessPoolExecutor(
+            self.__workers, context, initializer=init_worker, initargs=(self.__cancelled,)
+        )
+        for _ in range(self.__workers):
+            self.__executor.submit(registry, self.sources, self.width, self.height)
+
+    def solve(self, board: Board, offered: Iterable[str], budget: float) -> HintRequest:
+        """Ищет лучшую расстановку предложенных фигур не дольше budget секунд."""
+        self.start()
+        self.__generation += 1
+        deadline = time() + budget
+        catalogue = registry(self.sources, self.width, self.height)
+        futures: list[Future] = []
+        for order in dict.fromkeys(permutations(tuple(offered))):
+            first = catalogue[order[0]].positions(board.bits)
+            # Одна задача на строку первых ходов: отмена снимает невыполненные задачи сразу.
+            for y in sorted({y for _, y in first}):
+                row = tuple(position for position in first if position[1] == y)
+                futures.append(self.__executor.submit(
+                    search, self.sources, self.width, self.height, board.bits, order, row, deadline,
+                    self.__generation
+                ))
+        return HintRequest(futures, deadline, self.__cancelled, self.__generation)
+
+    def shutdown(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
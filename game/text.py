@@ -0,0 +1,108 @@
+from functools import lru_cache
+from string import printable
+
+import pygame
+
+from .assets import AssetCache, to_display_format
+
+# Бюджет кэша отрисованных строк: подписи и всплывающие надписи весят килобайты.
+TEXT_BUDGET: int = 4 * 1024 * 1024
+# Символы атласа для чисел: счёт, комбо и проценты.
+NUMBER_CHARS: str = "0123456789+-.,:x% "
+# Все печатные символы ASCII без переводов строк — для строк, меняющихся каждый кадр.
+ASCII_CHARS: str = printable[:-5]
+WHITE: tuple[int, int, int] = (255, 255, 255)
+
+Color = tuple[int, int, int] | tuple[int, int, int, int]
+
+
+@lru_cache(maxsize=None)
+def font(path: str | None, size: int) -> pygame.font.Font:
+    """Шрифт по пути и размеру загружается один раз; path=None — встроенный шрифт pygame."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(path, size)
+
+
+text_cache: AssetCache = AssetCache(TEXT_BUDGET)
+
+
+def render(
+        text: str,
+        size: int,
+        color: Color = WHITE,
+        path: str | None = None,
+        antialias: bool = True
+) -> pygame.Surface:
+    """Строка, отрисованная Font.render только при первом запросе; давно не нужные строки вытесняются."""
+    key = ("text", path, size, text, tuple(color), antialias)
+    surface = text_cache.get(key)
+    if surface is None:
+        surface = text_cache.put(key, to_display_format(font(path, size).render(text, antialias, color)))
+    return surface
+
+
+@lru_cache(maxsize=64)
+def glyph_atlas(
+        size: int,
+        color: Color = WHITE,
+        chars: str = NUMBER_CHARS,
+        path: str | None = None
+) -> "GlyphAtlas":
+    """Общий атлас для шрифта, цвета и набора символов."""
+    return GlyphAtlas(size, color, chars, path)
+
+
+class GlyphAtlas:
+    """Символы одного шрифта и цвета, заранее отрисованные в одну поверхность.
+
+    Строка из этих символов собирается одним Surface.blits по глифам, без Font.render:
+    так счёт, меняющийся каждый кадр, стоит несколько копирований. Кернинг не учитывается."""
+
+    __slots__ = ("surface", "height", "__glyphs")
+
+    def __init__(
+            self,
+            size: int,
+            color: Color = WHITE,
+            chars: str = NUMBER_CHARS,
+            path: str | None = None,
+            antialias: bool = True
+    ) -> None:
+        face = font(path, size)
+        glyphs = [(char, face.render(char, antialias, color)) for char in dict.fromkeys(chars)]
+        self.height: int = face.get_height()
+        surface = pygame.Surface((sum(glyph.get_width() for _, glyph in glyphs), self.height), pygame.SRCALPHA)
+        self.__glyphs: dict[str, pygame.Rect] = {}
+        x = 0
+        for char, glyph in glyphs:
+            self.__glyphs[char] = surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        self.surface: pygame.Surface = to_display_format(surface)
+
+    def __contains__(self, char: str) -> bool:
+        return char in self.__glyphs
+
+    def width(self, text: str) -> int:
+        glyphs = self.__glyphs
+        return sum(glyphs[char].width for char in text)
+
+    def size(self, text: str) -> tuple[int, int]:
+        return self.width(text), self.height
+
+    def blits(self, text: str, topleft: tuple[int, int]) -> list[tuple[pygame.Surface, tuple[int, int], pygame.Rect]]:
+        """Аргументы Surface.blits для строки; символ не из атласа — KeyError."""
+        x, y = topleft
+        atlas = self.surface
+        glyphs = self.__glyphs
+        sequence = []
+        for char in text:
+            area = glyphs[char]
+            sequence.append((atlas, (x, y), area))
+            x += area.width
+        return sequence
+
+    def draw(self, target: pygame.Surface, text: str, topleft: tuple[int, int] = (0, 0)) -> pygame.Rect:
+        """Рисует строку в target и возвращает занятый прямоугольник."""
+        target.blits(self.blits(text, topleft), False)
+        return pygame.Rect(topleft, self.size(text))
@@ -0,0 +1,148 @@
+from functools import lru_cache
+from typing import Iterable
+
+import pygame
+
+from .assets import to_display_format
+
+# Метки пикселей маски: 0 — прозрачный, 1–5 — оттенки палитры в порядке shapes.json, 255 — белая рамка.
+TRANSPARENT, MAIN, TOP, LEFT, RIGHT, BOTTOM = range(6)
+BORDER: int = 255
+BORDER_COLOR: tuple[int, int, int] = (255, 255, 255)
+# Маска — 8-битная поверхность с серой палитрой: метка i рисуется цветом (i, i, i).
+GRAYSCALE: list[tuple[int, int, int]] = [(index, index, index) for index in range(256)]
+# Прозрачность призрака фигуры под курсором.
+GHOST_ALPHA: int = 110
+# Множители оттенков палитры, выведенной из одного цвета темы: блик осветляется, тени затемняются.
+LIGHTEN: float = 0.45
+DARKEN: tuple[float, float, float] = (0.7, 0.65, 0.45)
+
+Palette = tuple[tuple[int, int, int], ...]
+
+
+def shades(color: Iterable[int]) -> Palette:
+    """Строит палитру из пяти оттенков по одному цвету, например для пользовательской темы."""
+    base = tuple(color)[:3]
+    top = tuple(channel + (255 - channel) * LIGHTEN for channel in base)
+    rows = [base, top, *(tuple(channel * factor for channel in base) for factor in DARKEN)]
+    return tuple(tuple(int(round(channel)) for channel in row) for row in rows)
+
+
+# Палитра подсветки «сюда поставить нельзя».
+BLOCKED: Palette = shades((220, 40, 40))
+
+
+def label_surface(size: tuple[int, int]) -> pygame.Surface:
+    """Пустая маска: 8-битная поверхность с серой палитрой, все пиксели прозрачные."""
+    surface = pygame.Surface(size, 0, 8)
+    surface.set_palette(GRAYSCALE)
+    surface.fill(TRANSPARENT)
+    return surface
+
+
+@lru_cache(maxsize=None)
+def block_labels(block_size: int, padding: int, border_thickness: int) -> pygame.Surface:
+    """Маска одного блока: рисуется один раз теми же примитивами, что и DrawImage, но вместо цветов — метками."""
+    from .objects import DrawImage
+
+    surface = label_surface((block_size, block_size))
+    labels = tuple((label, label, label) for label in (MAIN, TOP, LEFT, RIGHT, BOTTOM))
+    DrawImage()._render_3d_block(surface, 0, 0, labels, block_size, padding, border_thickness)
+    return surface
+
+
+def shape_labels(
+        cells: Iterable[tuple[int, int]],
+        block_size: int,
+        padding: int,
+        border_thickness: int,
+        surface: pygame.Surface | None = None,
+        topleft: tuple[int, int] = (0, 0)
+) -> pygame.Surface:
+    """Маска фигуры: маски блоков в клетках фигуры, остальное прозрачно. Рисуется в surface, если она задана."""
+    cells = tuple(cells)
+    min_x = min(x for x, _ in cells)
+    min_y = min(y for _, y in cells)
+    if surface is None:
+        width = (max(x for x, _ in cells) - min_x + 1) * block_size
+        height = (max(y for _, y in cells) - min_y + 1) * block_size
+        surface = label_surface((width, height))
+    block = block_labels(block_size, padding, border_thickness)
+    surface.blits(
+        [(block, (topleft[0] + (x - min_x) * block_size, topleft[1] + (y - min_y) * block_size)) for x, y in cells],
+        False
+    )
+    return surface
+
+
+def palette(colors: Palette) -> list[tuple[int, int, int]]:
+    """Палитра маски для пяти оттенков: метка -> цвет."""
+    entries = [(0, 0, 0), *(tuple(color[:3]) for color in colors[:BOTTOM])]
+    return entries + [(0, 0, 0)] * (BORDER - len(entries)) + [BORDER_COLOR]
+
+
+def tint_into(surface: pygame.Surface, topleft: tuple[int, int], labels: pygame.Surface, colors: Palette) -> None:
+    """Раскрашивает маску палитрой прямо в surface. Замену метки цветом делает табличный blit SDL
+    из 8-битной поверхности, без промежуточных массивов; прозрачные метки пропускаются.
+
+    Палитра ставится на копию маски: одну маску раскрашивают и фоновый поток, и кадр."""
+    labels = labels.copy()
+    labels.set_palette(palette(colors))
+    labels.set_colorkey(TRANSPARENT)
+    surface.fill((0, 0, 0, 0), pygame.Rect(topleft, labels.get_size()))
+    surface.blit(labels, topleft)
+
+
+def tint(labels: pygame.Surface, colors: Palette, alpha: int = 255) -> pygame.Surface:
+    """Возвращает новую поверхность с маской, раскрашенной палитрой, и общей прозрачностью alpha."""
+    surface = to_display_format(pygame.Surface(labels.get_size(), pygame.SRCALPHA))
+    tint_into(surface, (0, 0), labels, colors)
+    if alpha < 255:
+        surface.set_alpha(alpha)
+    return surface
+
+
+class Tinter:
+    """Спрайты фигур любой палитры и прозрачности из масок, отрисованных по одному разу на фигуру.
+
+    Подходит для призраков под курсором, подсветки «нельзя поставить» и тем, заданных во время игры."""
+
+    def __init__(self, block_size: int = 43, padding: int = 4, border_thickness: int = 1) -> None:
+        self.block_size = block_size
+        self.padding = padding
+        self.border_thickness = border_thickness
+        self.__labels: dict[tuple[tuple[int, int], ...], pygame.Surface] = {}
+        self.__sprites: dict[tuple, pygame.Surface] = {}
+
+    def labels(self, cells: Iterable[tuple[int, int]]) -> pygame.Surface:
+        key = tuple(cells)
+        mask = self.__labels.get(key)
+        if mask is None:
+            mask = self.__labels[key] = shape_labels(key, self.block_size, self.padding, self.border_thickness)
+        return mask
+
+    def sprite(self, cells: Iterable[tuple[int, int]], colors: Palette, alpha: int = 255) -> pygame.Surface:
+        cells = tuple(cells)
+        colors = tuple(tuple(color) for color in colors)
+        key = (cells, colors, alpha)
+        sprite = self.__sprites.get(key)
+        if sprite is None:
+            sprite = self.__sprites[key] = tint(self.labels(cells), colors, alpha)
+        return sprite
+
+    def ghost(self, cells: Iterable[tuple[int, int]], colors: Palette) -> pygame.Surface:
+        return self.sprite(cells, colors, GHOST_ALPHA)
+
+    def blocked(self, cells: Iterable[tuple[int, int]]) -> pygame.Surface:
+        return self.sprite(cells, BLOCKED, GHOST_ALPHA)
+
+    def clear(self) -> None:
+        self.__sprites.clear()
+
+    @property
+    def bytes(self) -> int:
+        """Память масок и готовых спрайтов."""
+        return sum(
+            surface.get_pitch() * surface.get_height()
+            for surface in (*self.__labels.values(), *self.__sprites.values())
+        )
@@ -1,49 +1,72 @@
-from typing import List, Tuple, Callable, overload
+from typing import List, Sequence, Tuple, Callable, overload
 from pygame import Surface
-from pygame.transform import smoothscale
-from pygame.image import load
 from functools import singledispatch
-from .base_widget import BaseWidget
+from game.assets import asset_cache
+from .base_widget import BaseWidget, checked_children
 
 
 class BackgroundImage(BaseWidget):
+    __slots__: Tuple[str, ...] = ('__size_of_surface', '__scaled_surface')
+
+    # Фон — общая картинка из asset_cache, в неё не рисуют; mark_dirty лишь просит перерисовать кадр.
+    owns_source: bool = False
+
     def __init__(
         self,
         parent: Surface,
         surface_object: Surface,
         coords: Tuple[int, int],
         size_of_surface: Tuple[int, int],
-        child_surfaces: List[BaseWidget] = []
+        child_surfaces: Sequence[BaseWidget] = (),
+        scaled_surface: Surface | None = None,
+        composite: bool = False
     ):
-        super().__init__(parent, surface_object, coords, child_surfaces)
-        self.__size_of_surface: Tuple[int, int] = size_of_surface
+        super().__init__(parent, surface_object, coords, child_surfaces, composite)
+        self.__size_of_surface: Tuple[int, int] = tuple(size_of_surface)
+        self.__scaled_surface: Surface | None = scaled_surface
+
+    @property
+    def size_of_surface(self) -> Tuple[int, int]:
+        return self.__size_of_surface
+
+    @property
+    def scaled_surface(self) -> Surface:
+        # Масштабируем один раз на каждый целевой размер, а не на каждый кадр;
+        # размеры, уже встречавшиеся раньше, берутся из общего кэша.
+        if self.__scaled_surface is None or self.__scaled_surface.get_size() != self.__size_of_surface:
+            self.__scaled_surface = asset_cache.scaled(self.surface, self.__size_of_surface)
+        return self.__scaled_surface
 
-    def draw(self):
-        self.parent.blit(smoothscale(self.surface, self.__size_of_surface), self.coords)
-        for surface in self.child_surfaces:
-            surface.draw()
+    @property
+    def own_image(self) -> Surface:
+        return self.scaled_surface
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'BackgroundImage':
+        coords, size = tuple(coords), tuple(size)
+        if coords == self.coords and size == self.__size_of_surface:
+            return self
+        return BackgroundImage(
+            self.parent,
+            self.surface,
+            coords,
+            size,
+            self.rescale_children(coords, size),
+            composite=self.composite
+        )
 
     def add_child_surfaces(self, surfaces: List[BaseWidget] | BaseWidget) -> BaseWidget:
-        all_surfaces: List[BaseWidget] = self.child_surfaces
-        if isinstance(surfaces, BaseWidget):
-            surfaces = [surfaces]
-        for surface in surfaces:
-            if isinstance(surface, BaseWidget):
-                all_surfaces.append(surface)
-                continue
-            raise TypeError(
-                (
-                    'The surface argument must be of type List[BaseWidget] '
-                    f'or BaseWidget, type error: {type(surface)}.'
-                )
-            )
-        return self.__class__(
+        # Возвращает новый узел со своим списком детей; исходный узел не меняется.
+        widget: BackgroundImage = self.__class__(
             self.parent,
             self.surface,
             self.coords,
             self.__size_of_surface,
-            self.child_surfaces
+            [*self.child_surfaces, *checked_children(surfaces)],
+            self.__scaled_surface,
+            self.composite
         )
+        widget.z = self.z
+        return widget
 
 
 class Background:
@@ -56,9 +79,10 @@ class Background:
             surface_object: Surface | str,
             coords: Tuple[int, int],
             size_of_surface: Tuple[int, int] | None = None,
-            child_surfaces: List[Surface] = []
+            child_surfaces: Sequence[BaseWidget] = ()
         ):
-            return valid_parameters(
+            # Выбор ветки зависит от типа surface_object, а не от первого аргумента.
+            return valid_parameters.dispatch(type(surface_object))(
                 parent, surface_object, coords, size_of_surface, child_surfaces
             )
 
@@ -68,7 +92,7 @@ class Background:
             surface_object: Surface | str,
             coords: Tuple[int, int],
             size_of_surface: Tuple[int, int] | None = None,
-            child_surfaces: List[Surface] = []
+            child_surfaces: Sequence[BaseWidget] = ()
         ):
             # name_of_variable, description_of_variable, valid_types, invalid_type
             error_message: str = 'The "{}" parameter ({}) must be of type {}, invalid type: {}.'
@@ -105,27 +129,27 @@ class Background:
                 )
             raise NotImplementedError(message)
 
-        @valid_parameters.register
+        @valid_parameters.register(Surface)
         def _(
             parent: Surface,
             surface_object: Surface,
             coords: Tuple[int, int],
             size_of_surface: Tuple[int, int] | None = None,
-            child_surfaces: List[Surface] = []
+            child_surfaces: Sequence[BaseWidget] = ()
         ):
             if size_of_surface is None:
                 size_of_surface = surface_object.get_size()
             return func(parent, surface_object, coords, size_of_surface, child_surfaces)
 
-        @valid_parameters.register
+        @valid_parameters.register(str)
         def _(
             parent: Surface,
             surface_object: str,
             coords: Tuple[int, int],
             size_of_surface: Tuple[int, int] | None = None,
-            child_surfaces: List[Surface] = []
+            child_surfaces: Sequence[BaseWidget] = ()
         ):
-            surface_object = load(surface_object)
+            surface_object = asset_cache.image(surface_object)
             if size_of_surface is None:
                 size_of_surface = surface_object.get_size()
             return func(parent, surface_object, coords, size_of_surface, child_surfaces)
@@ -139,7 +163,7 @@ class Background:
         surface_object: Surface,
         coords: Tuple[int, int],
         size_of_surface: Tuple[int, int],
-        child_surfaces: List[Surface] = []
+        child_surfaces: Sequence[BaseWidget] = ()
     ) -> BackgroundImage: ...
     @staticmethod
     @overload
@@ -148,7 +172,7 @@ class Background:
         surface_object: str,
         coords: Tuple[int, int],
         size_of_surface: Tuple[int, int],
-        child_surfaces: List[Surface] = []
+        child_surfaces: Sequence[BaseWidget] = ()
     ) -> BackgroundImage: ...
 
     @staticmethod
@@ -158,11 +182,10 @@ class Background:
         surface_object: Surface,
         coords: Tuple[int, int],
         size_of_surface: Tuple[int, int],
-        child_surfaces: List[Surface] = []
+        child_surfaces: Sequence[BaseWidget] = ()
     ) -> BackgroundImage:
         return BackgroundImage(parent, surface_object, coords, size_of_surface, child_surfaces)
 
+    @staticmethod
     def resize(widget: BackgroundImage, size: Tuple[int, int]) -> BackgroundImage:
-        return BackgroundImage(
-            widget.parent, widget.surface, widget.coords, size, widget.child_surfaces
-        )
+        return widget.rescale(widget.coords, size)
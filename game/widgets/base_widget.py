@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, overload, Callable, List
+from operator import attrgetter
+from typing import Tuple, overload, Callable, List, Sequence
 from functools import singledispatch
-from pygame import Surface
+from weakref import WeakSet
+from pygame import Surface, Rect
+from game.assets import asset_cache
+from game.profiler import profiler
 
 
 class ABCWidget(ABC):
-    __slots__: Tuple[str, ...] = ('__parent', '__surface', '__coords', '__child_surfaces',)
+    __slots__: Tuple[str, ...] = (
+        '__parent', '__surface', '__coords', '__z', '__structure', '__owners', '__weakref__'
+    )
 
     def __init__(
         self,
@@ -16,6 +22,10 @@ class ABCWidget(ABC):
         self.__parent: Surface = parent
         self.__surface: Surface = surface_object
         self.__coords: Tuple[int, int] = coords
+        self.__z: int = 0
+        self.__structure: int = 0
+        # Узлы, в дети которых входит виджет; слабые ссылки не держат брошенные деревья.
+        self.__owners: WeakSet[ABCWidget] | None = None
 
     @property
     def surface(self) -> Surface:
@@ -29,6 +39,36 @@ class ABCWidget(ABC):
     def coords(self) -> Tuple[int, int]:
         return self.__coords
 
+    @property
+    def z(self) -> int:
+        """Порядок среди соседей: дети с большим z рисуются поверх, при равном — в порядке добавления."""
+        return self.__z
+
+    @z.setter
+    def z(self, z: int) -> None:
+        if z != self.__z:
+            self.__z = z
+            self.restructure()
+
+    @property
+    def structure(self) -> int:
+        """Версия структуры поддерева (z-порядок, сведение в композит): растёт при её изменении в узле
+        или в любом потомке. Скомпилированные списки отрисовки сверяются с ней вместо обхода дерева."""
+        return self.__structure
+
+    def attach(self, owner: 'ABCWidget') -> None:
+        # Узел может входить в несколько деревьев, например в исходное и в копию из add_child_surfaces.
+        if self.__owners is None:
+            self.__owners = WeakSet()
+        self.__owners.add(owner)
+
+    def restructure(self) -> None:
+        """Поднимает версию структуры узла и всех деревьев, в которые он входит; другие деревья не трогает."""
+        self.__structure += 1
+        if self.__owners:
+            for owner in list(self.__owners):
+                owner.restructure()
+
     @property
     def x(self) -> int:
         return self.__coords[0]
@@ -54,41 +94,259 @@ class ABCWidget(ABC):
         self.__parent.blit(self.__surface, self.__coords)
 
 
+# Элемент плоского списка отрисовки: узел, его прямоугольник и узлы, изменение которых его перерисовывает.
+DrawEntry = Tuple['BaseWidget', Rect, List['BaseWidget']]
+
+
 class BaseWidget(ABCWidget):
+    """Узел графа сцены. Дерево компилируется в плоский список отрисовки (родитель раньше детей,
+    дети по z), который пересобирается только при изменении структуры; грязные области рисуются
+    одним вызовом Surface.blits на поверхность родителя корня."""
+
+    # Рисует ли виджет в свой источник: тогда mark_dirty сбрасывает его масштабированные копии в кэше.
+    owns_source: bool = True
+
+    __slots__: Tuple[str, ...] = (
+        '__child_surfaces', '__source', '__dirty', '__revision', '__composite', '__composite_surface',
+        '__composite_signature', '__compiled', '__drawn', '__nodes', '__descendants', '__paint'
+    )
+
     def __init__(
         self,
         parent: Surface,
         surface_object: Surface,
         coords: Tuple[int, int],
-        child_surfaces: List[ABCWidget] = []
+        child_surfaces: Sequence[ABCWidget] = (),
+        composite: bool = False,
+        source: Surface | None = None
     ):
         super().__init__(parent, surface_object, coords)
-        self.__child_surfaces: List[ABCWidget] = child_surfaces
+        # Узел владеет своим списком детей: ни значение по умолчанию, ни чужой список не разделяются.
+        self.__child_surfaces: List[ABCWidget] = list(child_surfaces)
+        for child in self.__child_surfaces:
+            child.attach(self)
+        # Исходная поверхность: масштабирование всегда идёт от неё, чтобы не копить потери качества.
+        self.__source: Surface = source or surface_object
+        self.__dirty: bool = True
+        self.__revision: int = 0
+        self.__composite: bool = composite
+        self.__composite_surface: Surface | None = None
+        self.__composite_signature: Tuple | None = None
+        # Версия структуры, при которой собраны списки, и при которой кадр нарисован.
+        self.__compiled: int = -1
+        self.__drawn: int = -1
+        self.__nodes: List[BaseWidget] = []
+        self.__descendants: List[DrawEntry] = []
+        self.__paint: List[DrawEntry] = []
 
-    def draw(self):
-        self.parent.blit(self.surface, self.coords)
-        for surface in self.__child_surfaces:
-            surface.draw()
+    @property
+    def source(self) -> Surface:
+        return self.__source
+
+    @property
+    def own_image(self) -> Surface:
+        return self.surface
+
+    @property
+    def image(self) -> Surface:
+        if not self.__composite:
+            return self.own_image
+        # Статичное поддерево сводится в одну поверхность, пока дети не изменятся.
+        self.__compile()
+        signature: Tuple[int, int] = (self.structure, sum(node.__revision for node in self.__nodes[1:]))
+        if self.__composite_surface is None or signature != self.__composite_signature:
+            surface: Surface = self.own_image.copy()
+            surface.blits(
+                [(node.image, (rect.x - self.x, rect.y - self.y)) for node, rect, _ in self.__descendants], False
+            )
+            self.__composite_surface = surface
+            self.__composite_signature = signature
+        return self.__composite_surface
+
+    @property
+    def composite(self) -> bool:
+        return self.__composite
+
+    @composite.setter
+    def composite(self, composite: bool) -> None:
+        self.__composite = composite
+        self.__composite_surface = None
+        self.restructure()
+        self.mark_dirty()
+
+    def __compile(self) -> None:
+        """Разворачивает дерево в плоские списки; вызывается, только если изменилась структура."""
+        if self.__compiled == self.structure:
+            return
+        nodes: List[BaseWidget] = [self]
+        descendants: List[DrawEntry] = []
+        for child in sorted(self.__child_surfaces, key=attrgetter('z')):
+            child.__flatten(descendants, nodes)
+        rect: Rect = self.rect
+        self.__nodes = nodes
+        self.__descendants = descendants
+        # Композит рисуется одной поверхностью и перерисовывается при изменении любого узла поддерева.
+        self.__paint = [(self, rect, nodes)] if self.__composite else [(self, rect, [self]), *descendants]
+        self.__compiled = self.structure
+
+    def __flatten(self, draw_list: List[DrawEntry], nodes: List['BaseWidget']) -> None:
+        first: int = len(nodes)
+        nodes.append(self)
+        hidden: List[DrawEntry] = []
+        if not self.__composite:
+            draw_list.append((self, self.rect, [self]))
+        for child in sorted(self.__child_surfaces, key=attrgetter('z')):
+            child.__flatten(hidden if self.__composite else draw_list, nodes)
+        if self.__composite:
+            draw_list.append((self, self.rect, nodes[first:]))
+
+    @property
+    def revision(self) -> int:
+        self.__compile()
+        return sum(node.__revision for node in self.__nodes)
+
+    @property
+    def rect(self) -> Rect:
+        # Композит совпадает по размеру с собственным изображением, поэтому его не нужно сводить ради размера.
+        return Rect(self.coords, self.own_image.get_size())
 
     @property
-    def child_surfaces(self) -> List[ABCWidget]:
-        return self.__child_surfaces
+    def dirty(self) -> bool:
+        self.__compile()
+        return any(node.__dirty for node in self.__nodes)
+
+    def mark_dirty(self) -> None:
+        self.__dirty = True
+        self.__revision += 1
+        if self.owns_source and self.surface is self.__source:
+            asset_cache.changed(self.__source)
+
+    def dirty_rects(self) -> List[Rect]:
+        # Изменившийся корень или изменившаяся структура перерисовывают дерево целиком,
+        # иначе — только прямоугольники изменившихся узлов списка отрисовки.
+        self.__compile()
+        if self.__drawn != self.structure:
+            return [self.rect]
+        rects: List[Rect] = []
+        for node, rect, nodes in self.__paint:
+            for changed in nodes:
+                if changed.__dirty:
+                    if node is self:
+                        return [rect]
+                    rects.append(rect)
+                    break
+        return rects
+
+    def draw_area(self, area: Rect) -> None:
+        self.__render([area])
+
+    def draw_areas(self, areas: List[Rect]) -> None:
+        # Несколько областей, например старое и новое место спрайта поверх дерева, — одним вызовом blits.
+        self.__render(areas)
+
+    def __render(self, areas: List[Rect]) -> None:
+        self.__compile()
+        blits: List[Tuple[Surface, Tuple[int, int], Rect]] = []
+        owners: List[BaseWidget] = []
+        for area in areas:
+            for node, rect, _ in self.__paint:
+                clipped: Rect = area.clip(rect)
+                if clipped:
+                    blits.append((node.image, clipped.topleft, clipped.move(-rect.x, -rect.y)))
+                    owners.append(node)
+        if not profiler.enabled:
+            self.parent.blits(blits, False)
+            return
+        # При профилировании список делится на отрезки по виджетам: время и число blit пишутся каждому.
+        first: int = 0
+        for last in range(1, len(blits) + 1):
+            if last == len(blits) or owners[last] is not owners[first]:
+                started: float = profiler.start()
+                self.parent.blits(blits[first:last], False)
+                profiler.widget(owners[first], started, last - first)
+                first = last
+
+    def blit_onto(self, target: Surface, offset: Tuple[int, int]) -> None:
+        self.__compile()
+        target.blits(
+            [(node.image, (rect.x - offset[0], rect.y - offset[1])) for node, rect, _ in self.__paint], False
+        )
+
+    def clean(self) -> None:
+        self.__compile()
+        for node in self.__nodes:
+            node.__dirty = False
+        self.__drawn = self.structure
+
+    def draw(self) -> List[Rect]:
+        rects: List[Rect] = self.dirty_rects()
+        if rects:
+            self.__render(rects)
+        self.clean()
+        return rects
+
+    @property
+    def child_surfaces(self) -> Tuple[ABCWidget, ...]:
+        return tuple(self.__child_surfaces)
+
+    def rescale_children(self, coords: Tuple[int, int], size: Tuple[int, int]) -> List[ABCWidget]:
+        # Дети пропорционально переносятся из старого прямоугольника виджета в новый.
+        old: Rect = self.rect
+        scale_x: float = size[0] / old.width if old.width else 1.0
+        scale_y: float = size[1] / old.height if old.height else 1.0
+        children: List[ABCWidget] = []
+        for surface in self.__child_surfaces:
+            rect: Rect = surface.rect
+            child: ABCWidget = surface.rescale(
+                (round(coords[0] + (rect.x - old.x) * scale_x), round(coords[1] + (rect.y - old.y) * scale_y)),
+                (max(1, round(rect.width * scale_x)), max(1, round(rect.height * scale_y)))
+            )
+            child.z = surface.z
+            children.append(child)
+        return children
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'BaseWidget':
+        coords, size = tuple(coords), tuple(size)
+        if coords == self.coords and size == self.size:
+            return self
+        return BaseWidget(
+            self.parent,
+            asset_cache.scaled(self.__source, size),
+            coords,
+            self.rescale_children(coords, size),
+            self.__composite,
+            self.__source
+        )
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}{tuple(self.rect)}'
 
     def add_child_surfaces(self, surfaces: List[ABCWidget] | ABCWidget) -> ABCWidget:
-        all_surfaces: List[ABCWidget] = self.__child_surfaces
-        if isinstance(surfaces, ABCWidget):
-            surfaces = [surfaces]
-        for surface in surfaces:
-            if isinstance(surface, ABCWidget):
-                all_surfaces.append(surface)
-                continue
+        # Возвращает новый узел со своим списком детей; исходный узел не меняется.
+        widget: BaseWidget = self.__class__(
+            self.parent,
+            self.surface,
+            self.coords,
+            self.__child_surfaces + checked_children(surfaces),
+            self.__composite,
+            self.__source
+        )
+        widget.z = self.z
+        return widget
+
+
+def checked_children(surfaces: Sequence[ABCWidget] | ABCWidget) -> List[ABCWidget]:
+    if isinstance(surfaces, ABCWidget):
+        surfaces = [surfaces]
+    for surface in surfaces:
+        if not isinstance(surface, ABCWidget):
             raise TypeError(
                 (
                     'The surface argument must be of type List[ABCWidget] '
                     f'or ABCWidget, type error: {type(surface)}.'
                 )
             )
-        return self.__class__(self.parent, self.surface, self.coords, all_surfaces)
+    return list(surfaces)
 
 
 class Widget:
@@ -101,7 +359,8 @@ class Widget:
             surface_object: Surface | Tuple[int, int],
             coords: Tuple[int, int]
         ) -> None | BaseWidget:
-            return valid_parameters(parent, surface_object, coords)
+            # Выбор ветки зависит от типа surface_object, а не от первого аргумента.
+            return valid_parameters.dispatch(type(surface_object))(parent, surface_object, coords)
 
         @singledispatch
         def valid_parameters(
@@ -137,13 +396,13 @@ class Widget:
                 )
             raise NotImplementedError(message)
 
-        @valid_parameters.register
+        @valid_parameters.register(tuple)
         def _(
             parent: Surface, surface_object: Tuple[int, int], coords: Tuple[int, int]
         ) -> BaseWidget:
             return func(parent, Surface(surface_object), coords)
 
-        @valid_parameters.register
+        @valid_parameters.register(Surface)
         def _(
             parent: Surface, surface_object: Surface, coords: Tuple[int, int]
         ) -> BaseWidget:
@@ -173,8 +432,8 @@ class Widget:
 
     @staticmethod
     def resize_widget(widget: BaseWidget, size: Tuple[int, int]) -> BaseWidget:
-        return BaseWidget(widget.parent, Surface(size), widget.coords, widget.child_surfaces)
+        return widget.rescale(widget.coords, size)
 
     @staticmethod
     def recoords_widget(widget: BaseWidget, coords: Tuple[int, int]) -> BaseWidget:
-        return BaseWidget(widget.parent, widget.surface, coords, widget.child_surfaces)
+        return widget.rescale(coords, widget.rect.size)
@@ -0,0 +1,115 @@
+from typing import Dict, List, Tuple
+from pygame import Surface, Rect, SRCALPHA
+from pygame.draw import rect as draw_rect
+from game.objects import DrawImage, ShapeAtlas
+from game.rules import Game, OFFERED
+from .base_widget import BaseWidget
+
+
+class BoardWidget(BaseWidget):
+    """Поле партии и предложенные фигуры справа от него; перерисовывается только после хода
+    и когда фигуру берут из слота или возвращают в него."""
+
+    __slots__: Tuple[str, ...] = ('game', 'atlas', 'colors', 'drawer', 'hidden')
+
+    CELL: int = 43
+    GAP: int = 16
+    SLOT: int = 150
+    FRAME_COLOR: Tuple[int, int, int, int] = (20, 20, 30, 190)
+    GRID_COLOR: Tuple[int, int, int, int] = (90, 90, 110, 255)
+    BLOCK_COLOR: str = 'cyan'
+
+    def __init__(
+        self,
+        parent: Surface,
+        coords: Tuple[int, int],
+        game: Game,
+        atlas: ShapeAtlas,
+        colors: Dict[str, Tuple[Tuple[int, int, int], ...]]
+    ):
+        super().__init__(parent, Surface(self.layout_size(game), SRCALPHA), coords)
+        self.game: Game = game
+        self.atlas: ShapeAtlas = atlas
+        self.colors: Dict[str, Tuple[Tuple[int, int, int], ...]] = colors
+        self.drawer: DrawImage = DrawImage()
+        # Слот фигуры, которую сейчас перетаскивают: он рисуется пустым.
+        self.hidden: int | None = None
+        self.render()
+
+    @classmethod
+    def layout_size(cls, game: Game) -> Tuple[int, int]:
+        board = game.board
+        return (
+            board.width * cls.CELL + cls.GAP + cls.SLOT,
+            max(board.height * cls.CELL, OFFERED * cls.SLOT)
+        )
+
+    def board_rect(self) -> Rect:
+        return Rect(0, 0, self.game.board.width * self.CELL, self.game.board.height * self.CELL)
+
+    def slot_rect(self, index: int) -> Rect:
+        return Rect(self.board_rect().right + self.GAP, index * self.SLOT, self.SLOT, self.SLOT)
+
+    def slot_at(self, position: Tuple[int, int]) -> int | None:
+        """Слот с фигурой под точкой экрана или None."""
+        x, y = position[0] - self.x, position[1] - self.y
+        for index in range(len(self.game.offered)):
+            if self.slot_rect(index).collidepoint(x, y):
+                return index
+        return None
+
+    def slot_color(self, index: int) -> str:
+        # Цвет следует за фигурой, а не за слотом: после хода оставшиеся фигуры сдвигаются, но не перекрашиваются.
+        names: List[str] = list(self.colors)
+        return names[self.game.registry.index(self.game.offered[index]) % len(names)]
+
+    @property
+    def block_color(self) -> str:
+        # Палитры задаются свободно: если в теме нет цвета поля, берётся первый.
+        return self.BLOCK_COLOR if self.BLOCK_COLOR in self.colors else next(iter(self.colors))
+
+    def slot_sprite(self, index: int) -> Tuple[Surface, Rect]:
+        """Спрайт фигуры слота и его прямоугольник на экране."""
+        sprite: Surface = self.atlas.sprite(self.slot_color(index), self.game.offered[index].source)
+        return sprite, sprite.get_rect(center=self.slot_rect(index).center).move(self.coords)
+
+    def render(self) -> None:
+        """Рисует поле и предложенные фигуры заново и помечает виджет грязным."""
+        surface: Surface = self.surface
+        board = self.game.board
+        surface.fill((0, 0, 0, 0))
+        area: Rect = self.board_rect()
+        draw_rect(surface, self.FRAME_COLOR, area)
+        for x in range(board.width):
+            for y in range(board.height):
+                draw_rect(surface, self.GRID_COLOR, (x * self.CELL, y * self.CELL, self.CELL, self.CELL), 1)
+        self.drawer.draw_blocks(
+            surface,
+            [
+                (x * self.CELL, y * self.CELL)
+                for y in range(board.height) for x in range(board.width) if (x, y) in board
+            ],
+            self.colors[self.block_color],
+            self.CELL,
+            4,
+            1
+        )
+        for index in range(len(self.game.offered)):
+            if index != self.hidden:
+                sprite, rect = self.slot_sprite(index)
+                surface.blit(sprite, rect.move(-self.x, -self.y))
+        self.mark_dirty()
+
+    def use_atlas(self, atlas: ShapeAtlas, colors: Dict[str, Tuple[Tuple[int, int, int], ...]]) -> None:
+        """Переключает виджет на атлас с новыми цветами или фигурами; перерисовывается только поле."""
+        self.atlas = atlas
+        self.colors = colors
+        self.render()
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'BoardWidget':
+        # Клетки не масштабируются вместе с фоном: поле остаётся центрированным в своей доле окна.
+        center: Tuple[int, int] = (coords[0] + size[0] // 2, coords[1] + size[1] // 2)
+        coords = (center[0] - self.width // 2, center[1] - self.height // 2)
+        if coords == self.coords:
+            return self
+        return BoardWidget(self.parent, coords, self.game, self.atlas, self.colors)
@@ -0,0 +1,83 @@
+from typing import List, Sequence, Tuple
+from pygame import Surface, Rect, SRCALPHA
+from game.preview import Preview
+from game.tint import Tinter
+from .base_widget import BaseWidget
+from .text import centered
+
+
+class PlacementLayer(BaseWidget):
+    """Слой над клетками поля: призрак фигуры или подсветка «нельзя поставить» и линии,
+    которые очистит ход. Размером ровно с поле, так что его смена перерисовывает только поле."""
+
+    __slots__: Tuple[str, ...] = ('cell', 'tinter')
+
+    LINE_COLOR: Tuple[int, int, int, int] = (255, 255, 255, 70)
+
+    def __init__(self, parent: Surface, coords: Tuple[int, int], size: Tuple[int, int], cell: int, tinter: Tinter):
+        super().__init__(parent, Surface(size, SRCALPHA), coords)
+        self.cell: int = cell
+        self.tinter: Tinter = tinter
+        self.surface.fill((0, 0, 0, 0))
+
+    def show(self, preview: Preview | None, colors: Sequence[Sequence[int]]) -> None:
+        """Рисует предпросмотр хода цветами colors; None очищает слой."""
+        surface: Surface = self.surface
+        cell: int = self.cell
+        surface.fill((0, 0, 0, 0))
+        if preview is not None:
+            for row in preview.rows:
+                surface.fill(self.LINE_COLOR, (0, row * cell, self.width, cell))
+            for column in preview.columns:
+                surface.fill(self.LINE_COLOR, (column * cell, 0, cell, self.height))
+            cells = preview.shape.cells
+            sprite: Surface = self.tinter.ghost(cells, colors) if preview.legal else self.tinter.blocked(cells)
+            surface.blit(sprite, (preview.cell[0] * cell, preview.cell[1] * cell))
+        self.mark_dirty()
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'PlacementLayer':
+        coords = centered(self, coords, size)
+        if coords == self.coords:
+            return self
+        return PlacementLayer(self.parent, coords, self.size, self.cell, self.tinter)
+
+
+class DraggedShape:
+    """Фигура под курсором. Рисуется поверх дерева, как оверлей: кадр восстанавливает из дерева
+    только старое и новое место спрайта, а не всё окно."""
+
+    __slots__: Tuple[str, ...] = ('parent', 'sprite', 'topleft', '__drawn')
+
+    def __init__(self, parent: Surface):
+        self.parent: Surface = parent
+        self.sprite: Surface | None = None
+        self.topleft: Tuple[int, int] = (0, 0)
+        self.__drawn: Rect | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.sprite is not None
+
+    def pick(self, sprite: Surface, topleft: Tuple[int, int]) -> None:
+        self.sprite = sprite
+        self.topleft = topleft
+
+    def move(self, topleft: Tuple[int, int]) -> None:
+        self.topleft = topleft
+
+    def drop(self) -> None:
+        self.sprite = None
+
+    def draw_over(self, tree: BaseWidget, rects: List[Rect]) -> List[Rect]:
+        """Дорисовывает спрайт после кадра дерева, в котором обновились rects."""
+        target: Rect | None = None if self.sprite is None else Rect(self.topleft, self.sprite.get_size())
+        drawn: Rect | None = self.__drawn
+        if target == drawn and (target is None or target.collidelist(rects) < 0):
+            return []
+        # Спрайт полупрозрачен по краям, поэтому под ним сначала восстанавливается дерево.
+        areas: List[Rect] = [target] if drawn == target else [area for area in (drawn, target) if area is not None]
+        tree.draw_areas(areas)
+        if target is not None:
+            self.parent.blit(self.sprite, target)
+        self.__drawn = target
+        return areas
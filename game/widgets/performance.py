@@ -0,0 +1,86 @@
+from typing import List, Tuple
+from pygame import Surface, Rect, SRCALPHA
+from pygame.draw import rect as draw_rect
+from game.assets import asset_cache
+from game.profiler import profiler
+from game.text import ASCII_CHARS, GlyphAtlas, WHITE, glyph_atlas
+from .base_widget import BaseWidget
+
+
+class PerformanceOverlay(BaseWidget):
+    __slots__: Tuple[str, ...] = ('__visible', '__shown', '__owns_profiler', '__glyphs')
+    BINS: int = 40
+    # Правая граница гистограммы: кадры дольше попадают в последнюю корзину.
+    LIMIT: float = 0.05
+    BUDGETS: Tuple[Tuple[float, Tuple[int, int, int]], ...] = (
+        (1 / 60, (80, 220, 80)),
+        (1 / 30, (230, 200, 40)),
+        (float('inf'), (230, 60, 60)),
+    )
+
+    def __init__(
+        self,
+        parent: Surface,
+        coords: Tuple[int, int] = (8, 8),
+        size: Tuple[int, int] = (280, 138)
+    ):
+        super().__init__(parent, Surface(size, SRCALPHA), coords)
+        self.__visible: bool = False
+        self.__shown: bool = False
+        self.__owns_profiler: bool = False
+        self.__glyphs: GlyphAtlas | None = None
+
+    @property
+    def visible(self) -> bool:
+        return self.__visible
+
+    def toggle(self) -> None:
+        self.__visible = not self.__visible
+        # Профилировщик, включённый флагом запуска, оверлей не выключает.
+        if self.__visible and not profiler.enabled:
+            profiler.enable()
+            self.__owns_profiler = True
+        elif not self.__visible and self.__owns_profiler:
+            profiler.disable()
+            self.__owns_profiler = False
+
+    def draw_over(self, tree: BaseWidget) -> List[Rect]:
+        if not self.__visible:
+            if not self.__shown:
+                return []
+            self.__shown = False
+            tree.draw_area(self.rect)
+            return [self.rect]
+        self.render()
+        tree.draw_area(self.rect)
+        started: float = profiler.start()
+        self.parent.blit(self.surface, self.coords)
+        profiler.widget(self, started)
+        self.__shown = True
+        return [self.rect]
+
+    def render(self) -> None:
+        if self.__glyphs is None:
+            # Строки меняются каждый кадр: они собираются из атласа глифов, а не через Font.render.
+            self.__glyphs = glyph_atlas(20, WHITE, ASCII_CHARS)
+        surface: Surface = self.surface
+        surface.fill((0, 0, 0, 170))
+        frame: float = profiler.frames[-1] if profiler.frames else 0.0
+        lines: Tuple[str, ...] = (
+            f'{profiler.fps:6.1f} FPS   {frame * 1000:6.2f} ms',
+            f'blits {profiler.last_frame.get("blits", 0)}   widgets {len(profiler.last_frame.get("widgets", {}))}',
+            f'assets {asset_cache.bytes / 2 ** 20:.1f}/{asset_cache.budget / 2 ** 20:.0f} MiB   '
+            f'hits {asset_cache.stats["hit_rate"]:.0%}',
+        )
+        for row, line in enumerate(lines):
+            self.__glyphs.draw(surface, line, (6, 4 + row * 18))
+        counts: List[int] = profiler.histogram(self.BINS, self.LIMIT)
+        top: int = 62
+        height: int = self.height - top - 4
+        width: int = (self.width - 12) // self.BINS
+        peak: int = max(counts) or 1
+        for index, count in enumerate(counts):
+            duration: float = (index + 1) / self.BINS * self.LIMIT
+            color = next(color for budget, color in self.BUDGETS if duration <= budget)
+            bar: int = round(count / peak * height)
+            draw_rect(surface, color, (6 + index * width, top + height - bar, width - 1, bar))
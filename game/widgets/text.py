@@ -0,0 +1,132 @@
+from typing import Tuple
+from pygame import Surface, SRCALPHA
+from game.text import Color, GlyphAtlas, WHITE, render
+from .base_widget import BaseWidget
+
+ALIGNMENTS: Tuple[str, ...] = ('left', 'center', 'right')
+
+
+def aligned_x(width: int, box: int, align: str) -> int:
+    if align == 'left':
+        return 0
+    if align == 'center':
+        return (box - width) // 2
+    return box - width
+
+
+def centered(widget: BaseWidget, coords: Tuple[int, int], size: Tuple[int, int]) -> Tuple[int, int]:
+    # Текст не масштабируется вместе с фоном: рамка остаётся центрированной в своей доле окна.
+    center: Tuple[int, int] = (coords[0] + size[0] // 2, coords[1] + size[1] // 2)
+    return center[0] - widget.width // 2, center[1] - widget.height // 2
+
+
+class TextWidget(BaseWidget):
+    """Строка в рамке постоянного размера; не поместившееся обрезается. Отрисованные строки
+    берутся из кэша game.text, а виджет перерисовывается и помечается грязным только при смене текста."""
+
+    __slots__: Tuple[str, ...] = ('__text', '__font_size', '__color', '__font_path', '__align')
+
+    def __init__(
+        self,
+        parent: Surface,
+        coords: Tuple[int, int],
+        size: Tuple[int, int],
+        text: str = '',
+        font_size: int = 24,
+        color: Color = WHITE,
+        font_path: str | None = None,
+        align: str = 'left'
+    ):
+        if align not in ALIGNMENTS:
+            raise ValueError(f'Unknown alignment {align!r}, expected one of {ALIGNMENTS}.')
+        super().__init__(parent, Surface(size, SRCALPHA), coords)
+        self.__font_size: int = font_size
+        self.__color: Color = tuple(color)
+        self.__font_path: str | None = font_path
+        self.__align: str = align
+        self.__text: str | None = None
+        self.text = text
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        if text == self.__text:
+            return
+        self.__text = text
+        self.render()
+
+    def render(self) -> None:
+        surface: Surface = self.surface
+        surface.fill((0, 0, 0, 0))
+        if self.__text:
+            image: Surface = render(self.__text, self.__font_size, self.__color, self.__font_path)
+            surface.blit(
+                image,
+                (aligned_x(image.get_width(), self.width, self.__align), (self.height - image.get_height()) // 2)
+            )
+        self.mark_dirty()
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'TextWidget':
+        coords = centered(self, coords, size)
+        if coords == self.coords:
+            return self
+        return TextWidget(
+            self.parent, coords, self.size, self.__text, self.__font_size, self.__color, self.__font_path,
+            self.__align
+        )
+
+
+class NumberWidget(BaseWidget):
+    """Число, собранное из атласа глифов: новое значение — несколько blit, без Font.render.
+    Присваивание того же значения ничего не делает, так что счёт можно обновлять каждый кадр."""
+
+    __slots__: Tuple[str, ...] = ('__value', '__atlas', '__template', '__align')
+
+    def __init__(
+        self,
+        parent: Surface,
+        coords: Tuple[int, int],
+        atlas: GlyphAtlas,
+        digits: int,
+        value: int = 0,
+        template: str = '{}',
+        align: str = 'right'
+    ):
+        if align not in ALIGNMENTS:
+            raise ValueError(f'Unknown alignment {align!r}, expected one of {ALIGNMENTS}.')
+        super().__init__(parent, Surface((atlas.width('0') * digits, atlas.height), SRCALPHA), coords)
+        self.__atlas: GlyphAtlas = atlas
+        self.__template: str = template
+        self.__align: str = align
+        self.__value: int | None = None
+        self.value = value
+
+    @property
+    def value(self) -> int:
+        return self.__value
+
+    @value.setter
+    def value(self, value: int) -> None:
+        if value == self.__value:
+            return
+        self.__value = value
+        self.render()
+
+    def render(self) -> None:
+        surface: Surface = self.surface
+        text: str = self.__template.format(self.__value)
+        surface.fill((0, 0, 0, 0))
+        self.__atlas.draw(surface, text, (aligned_x(self.__atlas.width(text), self.width, self.__align), 0))
+        self.mark_dirty()
+
+    def rescale(self, coords: Tuple[int, int], size: Tuple[int, int]) -> 'NumberWidget':
+        coords = centered(self, coords, size)
+        if coords == self.coords:
+            return self
+        return NumberWidget(
+            self.parent, coords, self.__atlas, self.width // self.__atlas.width('0'), self.__value,
+            self.__template, self.__align
+        )
@@ -1,7 +1,8 @@
-import pygame
-
-pygame.init()
 if __name__ == "__main__":
+    # Процессы пула (spawn) заново импортируют main как __mp_main__: pygame грузится только здесь.
+    import pygame
+
+    pygame.init()
     from game.game import main
 
     main()
@@ -8,33 +8,27 @@ class Dotenv:
     shapes_path: str
 
 
-@dataclass(slots=True)
-class ColorsOfShapes:
-    green: list[list[int]]
-    orange: list[list[int]]
-    red: list[list[int]]
-    cyan: list[list[int]]
-    gold: list[list[int]]
-
-
 @dataclass(slots=True)
 class WindowSettings:
-    size: list[int, int]
-    minimal_size: list[int, int]
+    size: tuple[int, int]
+    minimal_size: tuple[int, int]
     title: str
 
 
 @dataclass(slots=True)
 class GameSettings:
     FPS: int
+    pacing: str
 
 
 @dataclass(slots=True)
 class Config:
-    colors: ColorsOfShapes
+    # Палитры по имени: пять оттенков — основной, блик, левая, правая и нижняя тени.
+    colors: dict[str, list[list[int]]]
     shapes: list[str]
     window: WindowSettings
     game: GameSettings
     background_menu_path: str
     background_game_path: str
     icon: str
+    asset_cache_budget: int
@@ -1,10 +1,247 @@
-from dynaconf import Dynaconf
+import pickle
+import sys
+from dataclasses import fields, is_dataclass
+from hashlib import sha1
+from os import environ, replace
+from pathlib import Path
+from time import monotonic
+from typing import TYPE_CHECKING, get_args, get_type_hints
 from schemas.config import Config, Dotenv
 
-dotenv: Dotenv = Dynaconf(dotenv_path='.env', load_dotenv=True, envvar_prefix='DYNACONF_')
-settings: Config = Dynaconf(
-    settings_files=[
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+DOTENV_PATH: Path = Path('.env')
+SNAPSHOT_PATH: Path = Path('./.cache/settings.pickle')
+ENVVAR_PREFIX: str = 'DYNACONF_'
+# Как часто SettingsWatcher проверяет файлы настроек, в секундах.
+WATCH_INTERVAL: float = 1.0
+
+
+def schema_digest(*classes: type) -> str:
+    """Хэш имён и типов полей классов настроек вместе с вложенными dataclass: снимок, записанный
+    для другой схемы, не подходит."""
+    digest = sha1()
+    pending: list[type] = list(classes)
+    seen: set[type] = set()
+    while pending:
+        cls = pending.pop(0)
+        if cls in seen:
+            continue
+        seen.add(cls)
+        hints = get_type_hints(cls)
+        digest.update(f'{cls.__module__}.{cls.__qualname__}'.encode())
+        for field in fields(cls):
+            digest.update(f':{field.name}={hints[field.name]!r}'.encode())
+            types: list = [hints[field.name]]
+            while types:
+                kind = types.pop()
+                if is_dataclass(kind):
+                    pending.append(kind)
+                types.extend(get_args(kind))
+    return digest.hexdigest()
+
+
+SNAPSHOT_SCHEMA: str = schema_digest(Config, Dotenv)
+
+
+def file_digest(path: Path) -> str:
+    return sha1(path.read_bytes()).hexdigest()
+
+
+def file_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def environment() -> dict[str, str]:
+    # Переменные окружения Dynaconf переопределяют настройки, поэтому входят в ключ снимка.
+    return {key: value for key, value in environ.items() if key.startswith(ENVVAR_PREFIX)}
+
+
+def read_snapshot(variables: dict[str, str], path: Path = SNAPSHOT_PATH) -> tuple[Config, Dotenv] | None:
+    try:
+        with open(path, 'rb') as file:
+            snapshot: dict = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if snapshot.get('schema') != SNAPSHOT_SCHEMA or snapshot['environment'] != variables:
+        return None
+    stale: bool = False
+    for name, (stamp, digest) in snapshot['files'].items():
+        try:
+            if tuple(stamp) == file_stamp(Path(name)):
+                continue
+            # Файл тронут, но не изменён: достаточно обновить отметку времени.
+            if file_digest(Path(name)) != digest:
+                return None
+        except OSError:
+            return None
+        stale = True
+    if stale:
+        write_snapshot(snapshot['config'], snapshot['dotenv'], list(snapshot['files']), variables, path)
+    return snapshot['config'], snapshot['dotenv']
+
+
+def write_snapshot(
+    config: Config, dotenv: Dotenv, files: list[str], variables: dict[str, str], path: Path = SNAPSHOT_PATH
+) -> None:
+    snapshot: dict = {
+        'schema': SNAPSHOT_SCHEMA,
+        'environment': variables,
+        'files': {name: (file_stamp(Path(name)), file_digest(Path(name))) for name in files},
+        'config': config,
+        'dotenv': dotenv,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary: Path = path.with_suffix('.tmp')
+        with open(temporary, 'wb') as file:
+            pickle.dump(snapshot, file, pickle.HIGHEST_PROTOCOL)
+        replace(temporary, path)
+    except OSError:
+        pass
+
+
+def compile_settings() -> tuple[Config, Dotenv, list[str]]:
+    # Dynaconf и adaptix нужны только при промахе снимка.
+    from adaptix import Retort
+    from dynaconf import Dynaconf
+
+    retort: Retort = Retort()
+    dotenv_settings = Dynaconf(dotenv_path=str(DOTENV_PATH), load_dotenv=True, envvar_prefix=ENVVAR_PREFIX)
+    dotenv: Dotenv = retort.load(
+        {key.lower(): value for key, value in dotenv_settings.to_dict().items()}, Dotenv
+    )
+    files: list[str] = settings_files(dotenv)
+    config: Config = retort.load(
+        {key.lower(): value for key, value in Dynaconf(settings_files=files[1:]).to_dict().items()}, Config
+    )
+    return config, dotenv, files
+
+
+def settings_files(dotenv: Dotenv) -> list[str]:
+    return [
+        str(DOTENV_PATH),
         f'{dotenv.config_path}/{dotenv.config_file}',
         f'{dotenv.config_path}/{dotenv.shapes_path}'
     ]
-)
+
+
+def load_settings(path: Path = SNAPSHOT_PATH) -> tuple[Config, Dotenv]:
+    # Окружение запоминается до Dynaconf: он сам дописывает в него значения из .env.
+    variables: dict[str, str] = ENVIRONMENT
+    snapshot: tuple[Config, Dotenv] | None = read_snapshot(variables, path)
+    if snapshot is not None:
+        return snapshot
+    config, dotenv, files = compile_settings()
+    write_snapshot(config, dotenv, files, variables, path)
+    return config, dotenv
+
+
+def reload_settings(variables: dict[str, str]) -> tuple[Config, Dotenv, list[str]]:
+    """Собирает настройки заново и обновляет снимок; выполняется в процессе SettingsWatcher.
+
+    variables — окружение игры до Dynaconf. Процесс наследует окружение, в которое Dynaconf уже
+    дописал .env: без сброса ключ снимка не совпал бы при следующем запуске, а старые значения
+    из .env перекрыли бы новые."""
+    for key in environment().keys() - variables.keys():
+        del environ[key]
+    environ.update(variables)
+    config, dotenv, files = compile_settings()
+    write_snapshot(config, dotenv, files, variables)
+    return config, dotenv, files
+
+
+def update_settings(target: object, source: object, prefix: str = '') -> set[str]:
+    """Переносит изменённые поля source в target на месте и возвращает их пути вида 'window.size'.
+
+    Вложенные настройки обновляются по полям, так что ссылки на settings.window остаются живыми."""
+    changes: set[str] = set()
+    for field in fields(target):
+        old, new = getattr(target, field.name), getattr(source, field.name)
+        if is_dataclass(old) and type(old) is type(new):
+            changes |= update_settings(old, new, f'{prefix}{field.name}.')
+        elif old != new:
+            setattr(target, field.name, new)
+            changes.add(prefix + field.name)
+    return changes
+
+
+class SettingsWatcher:
+    """Опрашивает файлы настроек и перечитывает изменённые в фоновом процессе.
+
+    poll() дёшев и вызывается каждый кадр: файлы проверяются не чаще interval, а Dynaconf и adaptix
+    работают в отдельном процессе и не отнимают GIL у кадра. Ошибка в файле оставляет прежние настройки."""
+
+    def __init__(self, config: Config, files: list[str], interval: float = WATCH_INTERVAL) -> None:
+        self.config: Config = config
+        self.files: list[str] = files
+        self.interval: float = interval
+        self.__stamps: dict[str, tuple[int, int] | None] = self.__read_stamps()
+        self.__deadline: float = monotonic() + interval
+        self.__executor: 'ProcessPoolExecutor | None' = None
+        self.__future: 'Future | None' = None
+
+    def __read_stamps(self) -> dict[str, tuple[int, int] | None]:
+        stamps: dict[str, tuple[int, int] | None] = {}
+        for name in self.files:
+            try:
+                stamps[name] = file_stamp(Path(name))
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def poll(self) -> set[str]:
+        """Возвращает пути полей, изменившихся с прошлого вызова; обычно — пустое множество."""
+        if self.__future is not None:
+            if not self.__future.done():
+                return set()
+            future, self.__future = self.__future, None
+            try:
+                config, _, _ = future.result()
+            except Exception as error:
+                from concurrent.futures.process import BrokenProcessPool
+
+                print(f'Settings not reloaded: {error}', file=sys.stderr)
+                if isinstance(error, BrokenProcessPool):
+                    # Процесс перезапустится при следующем изменении файлов.
+                    self.close()
+                return set()
+            return update_settings(self.config, config)
+        now: float = monotonic()
+        if now < self.__deadline:
+            return set()
+        self.__deadline = now + self.interval
+        stamps = self.__read_stamps()
+        if stamps == self.__stamps:
+            return set()
+        self.__stamps = stamps
+        if self.__executor is None:
+            # multiprocessing нужен только после первой правки файлов, поэтому не замедляет запуск.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: процесс игры с pygame и фоновыми потоками нельзя безопасно форкать.
+            self.__executor = ProcessPoolExecutor(1, multiprocessing.get_context('spawn'))
+        self.__future = self.__executor.submit(reload_settings, ENVIRONMENT)
+        return set()
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+
+
+# Окружение при импорте, до того как Dynaconf допишет в него .env.
+ENVIRONMENT: dict[str, str] = environment()
+
+
+def __getattr__(name: str) -> Config | Dotenv:
+    # Настройки загружаются при первом обращении: процесс SettingsWatcher импортирует модуль
+    # только ради reload_settings и не должен собирать их дважды.
+    global settings, dotenv
+    if name not in ('settings', 'dotenv'):
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    settings, dotenv = load_settings()
+    return globals()[name]
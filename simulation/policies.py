@@ -0,0 +1,50 @@
+from random import Random
+from typing import Callable, Dict
+
+from game.rules import Game
+from game.shapes import Shape
+from game.solver import evaluate
+
+Move = tuple[Shape, int, int]
+Policy = Callable[[Game, Random], Move | None]
+
+POLICIES: Dict[str, Policy] = {}
+
+
+def policy(name: str) -> Callable:
+    """Регистрирует стратегию: она получает партию и свой генератор и возвращает ход или None."""
+    def decorator(func: Policy) -> Policy:
+        POLICIES[name] = func
+        return func
+    return decorator
+
+
+@policy('first')
+def first(game: Game, random: Random) -> Move | None:
+    """Первая фигура, которая помещается, в первую свободную позицию. Самая быстрая."""
+    for shape in game.offered:
+        positions = shape.positions(game.board.bits)
+        if positions:
+            return shape, *positions[0]
+    return None
+
+
+@policy('random')
+def uniform(game: Game, random: Random) -> Move | None:
+    """Случайный допустимый ход."""
+    moves = [(shape, x, y) for shape in game.offered for x, y in shape.positions(game.board.bits)]
+    return random.choice(moves) if moves else None
+
+
+@policy('greedy')
+def greedy(game: Game, random: Random) -> Move | None:
+    """Ход с лучшей оценкой решателя после одной постановки."""
+    best: Move | None = None
+    best_score = float('-inf')
+    for shape in dict.fromkeys(game.offered):
+        for x, y in shape.positions(game.board.bits):
+            board = game.board.copy()
+            score = evaluate(board, board.place(shape, x, y), game.registry)
+            if score > best_score:
+                best, best_score = (shape, x, y), score
+    return best
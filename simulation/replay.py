@@ -0,0 +1,37 @@
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from time import perf_counter
+from typing import List
+
+from game.replay import ReplayError, iter_replays, play
+from game.shapes import shape_registry
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = ArgumentParser(
+        prog='python -m simulation.replay', description='Replay a recorded corpus headless and verify every game.'
+    )
+    parser.add_argument('corpus', type=Path, help='file written by python -m simulation --record')
+    args = parser.parse_args(argv)
+
+    data: bytes = args.corpus.read_bytes()
+    registry = shape_registry()
+    games = moves = 0
+    started = perf_counter()
+    try:
+        for replay in iter_replays(data):
+            moves += play(replay, registry).moves
+            games += 1
+    except ReplayError as error:
+        # Все предыдущие партии сошлись, поэтому номер ломающейся равен их количеству.
+        print(f'game {games}: {error}', file=sys.stderr)
+        return 1
+    elapsed = perf_counter() - started
+    print(f'{games:,} games, {moves:,} moves verified in {elapsed:.2f} s')
+    print(f'{games / elapsed:,.0f} games/s, {moves / elapsed:,.0f} moves/s, {len(data) / max(moves, 1):.1f} bytes/move')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
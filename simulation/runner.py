@@ -0,0 +1,210 @@
+import csv
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from game.replay import MAX_COUNT, Recorder, encode
+from game.rules import Game, game_seed
+from game.solver import registry
+from settings import settings
+
+from .policies import POLICIES
+
+# Одна запись на партию; порядок записей совпадает с номерами партий.
+RECORD: np.dtype = np.dtype([
+    ('index', '<u8'),
+    ('seed', '<u8'),
+    ('moves', '<u4'),
+    ('lines', '<u4'),
+    ('score', '<u4'),
+    ('best_move', '<u2'),
+])
+PERCENTILES: tuple[float, ...] = (0.1, 0.5, 0.9, 0.99)
+
+
+def play_games(
+        policy: str,
+        sources: tuple[str, ...],
+        width: int,
+        height: int,
+        weights: tuple[float, ...] | None,
+        seed: int,
+        start: int,
+        stop: int,
+        max_moves: int,
+        record: bool = False
+) -> tuple[np.ndarray, bytes]:
+    """Играет партии с номерами [start, stop) и возвращает их записи и, если нужно, упакованные повторы;
+    выполняется в процессе пула."""
+    catalogue = registry(sources, width, height)
+    choose = POLICIES[policy]
+    records = np.zeros(stop - start, RECORD)
+    replays: list[bytes] = []
+    for row, index in enumerate(range(start, stop)):
+        game = Game(catalogue, game_seed(seed, index), weights)
+        player: Game | Recorder = Recorder(game) if record else game
+        # У стратегии свой генератор: выдача фигур не зависит от того, как играет стратегия.
+        random = Random(game.seed + 1)
+        best_move = 0
+        while game.moves < max_moves:
+            move = choose(game, random)
+            if move is None:
+                break
+            best_move = max(best_move, player.play(*move))
+        records[row] = index, game.seed, game.moves, game.lines, game.score, best_move
+        if record:
+            replays.append(encode(player.replay))
+    return records, b''.join(replays)
+
+
+class Summary:
+    """Сводная статистика по потоку записей: суммы и гистограммы, память не растёт с числом партий."""
+
+    FIELDS: tuple[str, ...] = ('moves', 'lines', 'score', 'best_move')
+
+    def __init__(self) -> None:
+        self.games: int = 0
+        self.histograms: Dict[str, np.ndarray] = {name: np.zeros(1, np.int64) for name in self.FIELDS}
+
+    def add(self, records: np.ndarray) -> None:
+        self.games += len(records)
+        for name in self.FIELDS:
+            counts = np.bincount(records[name])
+            histogram = self.histograms[name]
+            if len(counts) > len(histogram):
+                counts[:len(histogram)] += histogram
+                self.histograms[name] = counts
+            else:
+                histogram[:len(counts)] += counts
+
+    def mean(self, name: str) -> float:
+        histogram = self.histograms[name]
+        return float(histogram @ np.arange(len(histogram))) / self.games if self.games else 0.0
+
+    def percentile(self, name: str, fraction: float) -> int:
+        cumulative = np.cumsum(self.histograms[name])
+        return int(np.searchsorted(cumulative, fraction * self.games))
+
+    def report(self) -> str:
+        header = f'{"":10} {"mean":>10}' + ''.join(f' {f"p{fraction * 100:g}":>8}' for fraction in PERCENTILES)
+        rows = [
+            f'{name:10} {self.mean(name):10.2f}'
+            + ''.join(f' {self.percentile(name, fraction):8}' for fraction in PERCENTILES)
+            for name in self.FIELDS
+        ]
+        return '\n'.join([header, *rows])
+
+
+def shards(games: int, size: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, games, size):
+        yield start, min(start + size, games)
+
+
+def simulate(
+        policy: str,
+        games: int,
+        seed: int = 0,
+        workers: int | None = None,
+        shard: int = 1000,
+        weights: Sequence[float] | None = None,
+        output: Path | None = None,
+        max_moves: int = 100_000,
+        record: Path | None = None,
+        width: int = 8,
+        height: int = 8
+) -> Summary:
+    """Играет games партий, раскладывая их по процессам, и пишет записи в output (.csv или .npy) по мере готовности.
+    Если задан record, в него потоком пишется корпус повторов всех партий."""
+    if not 0 < max_moves <= MAX_COUNT:
+        # Ходы, линии и счёт хранятся как uint32 и в записях, и в повторах.
+        raise ValueError(f'max_moves must be between 1 and {MAX_COUNT}, got {max_moves}.')
+    sources = tuple(settings.shapes)
+    if weights is not None:
+        weights = tuple(weights)
+    workers = workers or cpu_count() or 1
+    ranges = list(shards(games, shard))
+    arguments = [
+        [policy] * len(ranges), [sources] * len(ranges), [width] * len(ranges), [height] * len(ranges),
+        [weights] * len(ranges), [seed] * len(ranges), [start for start, _ in ranges], [stop for _, stop in ranges],
+        [max_moves] * len(ranges), [record is not None] * len(ranges),
+    ]
+    summary = Summary()
+    writer = table = file = None
+    if output is not None and output.suffix == '.npy':
+        table = np.lib.format.open_memmap(output, mode='w+', dtype=RECORD, shape=(games,))
+    elif output is not None:
+        file = open(output, 'w', newline='')
+        writer = csv.writer(file)
+        writer.writerow(RECORD.names)
+    corpus = open(record, 'wb') if record is not None else None
+
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    started = perf_counter()
+    try:
+        # map отдаёт результаты по порядку партий, поэтому файл пишется потоком и детерминированно.
+        results = executor.map(play_games, *arguments) if executor is not None else map(play_games, *arguments)
+        for records, replays in results:
+            summary.add(records)
+            if corpus is not None:
+                corpus.write(replays)
+            if table is not None:
+                table[records['index'][0]:records['index'][-1] + 1] = records
+            if writer is not None:
+                writer.writerows(records.tolist())
+            elapsed = perf_counter() - started
+            print(f'\r{summary.games:,}/{games:,} games, {summary.games / elapsed:,.0f} games/s', end='', file=sys.stderr)
+        print(file=sys.stderr)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if table is not None:
+            table.flush()
+        if file is not None:
+            file.close()
+        if corpus is not None:
+            corpus.close()
+    return summary
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = ArgumentParser(prog='python -m simulation', description='Headless BlockPad self-play.')
+    parser.add_argument('--games', type=int, default=10_000, help='number of games to play')
+    parser.add_argument('--policy', choices=list(POLICIES), default='random', help='how pieces are placed')
+    parser.add_argument('--seed', type=int, default=0, help='base seed, every game derives its own from it')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='processes, default all cores')
+    parser.add_argument('--shard', type=int, default=1000, help='games per task')
+    parser.add_argument('--weights', help='comma-separated weight per shape in shapes.json order')
+    parser.add_argument('--max-moves', type=int, default=100_000, help='stop a game after this many moves')
+    parser.add_argument('--output', type=Path, help='write one record per game to a .csv or .npy file')
+    parser.add_argument('--record', type=Path, help='write a binary replay corpus of all games')
+    args = parser.parse_args(argv)
+    if not 0 < args.max_moves <= MAX_COUNT:
+        parser.error(f'--max-moves must be between 1 and {MAX_COUNT}')
+    for option in ('games', 'workers', 'shard'):
+        # workers по умолчанию None, если число ядер неизвестно: тогда simulate возьмёт один процесс.
+        value: int | None = getattr(args, option)
+        if value is not None and value <= 0:
+            parser.error(f'--{option} must be positive, got {value}')
+
+    weights: List[float] | None = None
+    if args.weights:
+        weights = [float(weight) for weight in args.weights.split(',')]
+        if len(weights) != len(settings.shapes):
+            parser.error(f'expected {len(settings.shapes)} weights, got {len(weights)}')
+
+    started = perf_counter()
+    summary = simulate(
+        args.policy, args.games, args.seed, args.workers, args.shard, weights, args.output, args.max_moves,
+        args.record
+    )
+    elapsed = perf_counter() - started
+    print(summary.report())
+    print(f'{summary.games:,} games in {elapsed:.2f} s, {summary.games / elapsed:,.0f} games/s')
+    return 0
@@ -0,0 +1,94 @@
+from os import environ
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from game.assets import AssetCache, AssetLoader, asset_cache  # noqa: E402
+from game.widgets.background import BackgroundImage  # noqa: E402
+from game.widgets.base_widget import BaseWidget  # noqa: E402
+
+
+def finish(loader: AssetLoader, *handles) -> None:
+    for handle in handles:
+        handle.result()
+    loader.pump()
+
+
+def test_loader_forgets_finished_handles_and_retries_failures(tmp_path) -> None:
+    loader = AssetLoader()
+    path = str(tmp_path / "image.bmp")
+    failed = loader.image(path)
+    assert loader.image(path) is failed
+    try:
+        failed.result()
+    except Exception:
+        pass
+    loader.pump()
+    assert failed.failed and loader.get(("image", path)) is None
+    assert loader.idle and loader.progress == 1.0
+    pygame.image.save(pygame.Surface((4, 4)), path)
+    retried = loader.image(path)
+    assert retried is not failed
+    finish(loader, retried)
+    assert retried.ready and loader.get(("image", path)) is None
+    # Готовое изображение берётся из asset_cache без новой загрузки.
+    again = loader.image(path)
+    assert again.ready and again.result() is asset_cache.get(("image", path))
+    assert loader.total == 2
+    loader.shutdown()
+    asset_cache.clear()
+
+
+def test_cache_evicts_least_recently_used_first() -> None:
+    cache = AssetCache(budget=3 * 4 * 4 * 4)
+    surfaces = {key: pygame.Surface((4, 4), 0, 32) for key in "abcd"}
+    for key in "abc":
+        cache.put(key, surfaces[key])
+    assert cache.get("a") is surfaces["a"]
+    cache.put("d", surfaces["d"])
+    assert "b" not in cache and list("acd") == [key for key in "abcd" if key in cache]
+    cache.put("e", pygame.Surface((4, 4), 0, 32))
+    assert "c" not in cache and "a" in cache
+    assert cache.evictions == 2 and cache.bytes == 3 * 4 * 4 * 4
+
+
+def test_cache_put_replaces_entry_bytes() -> None:
+    cache = AssetCache()
+    cache.put("a", pygame.Surface((4, 4), 0, 32))
+    cache.put("b", pygame.Surface((2, 2), 0, 32))
+    assert cache.bytes == 4 * 4 * 4 + 2 * 2 * 4
+    cache.put("a", pygame.Surface((8, 8), 0, 32))
+    assert len(cache) == 2 and cache.bytes == 8 * 8 * 4 + 2 * 2 * 4
+    cache.put("a", pygame.Surface((1, 1), 0, 32))
+    assert cache.bytes == 4 + 2 * 2 * 4 and cache.evictions == 0
+
+
+def test_cache_stats() -> None:
+    cache = AssetCache(budget=1000)
+    assert cache.stats["hit_rate"] == 0.0
+    cache.put("a", pygame.Surface((2, 2), 0, 32))
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats == {
+        "entries": 1, "bytes": 16, "budget": 1000, "hits": 2, "misses": 1, "hit_rate": 2 / 3, "evictions": 0
+    }
+
+
+def test_mark_dirty_drops_scaled_copies_of_own_source() -> None:
+    pygame.display.set_mode((8, 8))
+    parent = pygame.Surface((8, 8))
+    source = pygame.Surface((4, 4))
+    source.fill((255, 0, 0))
+    widget = BaseWidget(parent, source, (0, 0))
+    assert widget.rescale((0, 0), (8, 8)).surface.get_at((0, 0))[:3] == (255, 0, 0)
+    source.fill((0, 0, 255))
+    widget.mark_dirty()
+    assert widget.rescale((0, 0), (8, 8)).surface.get_at((0, 0))[:3] == (0, 0, 255)
+    # Фон не рисует в общую картинку: его mark_dirty не сбрасывает масштабированные копии.
+    background = BackgroundImage(parent, source, (0, 0), (6, 6))
+    scaled = asset_cache.scaled(source, (6, 6))
+    background.mark_dirty()
+    assert asset_cache.scaled(source, (6, 6)) is scaled
+    asset_cache.clear()
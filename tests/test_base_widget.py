@@ -0,0 +1,29 @@
+from os import environ
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from game.profiler import Profiler  # noqa: E402
+from game.widgets import base_widget  # noqa: E402
+from game.widgets.base_widget import Widget  # noqa: E402
+
+
+def test_profiler_records_every_widget_of_a_flattened_tree(monkeypatch) -> None:
+    pygame.display.init()
+    screen = pygame.display.set_mode((200, 200))
+    children = [Widget.create_widget(screen, (40, 40), (10, 10)), Widget.create_widget(screen, (40, 40), (100, 10))]
+    tree = Widget.create_widget(screen, (200, 200), (0, 0)).add_child_surfaces(children)
+    profiler = Profiler()
+    monkeypatch.setattr(base_widget, "profiler", profiler)
+    profiler.enable()
+    profiler.begin_frame()
+    tree.draw()
+    assert set(profiler.widgets) == {repr(tree), *(repr(child) for child in children)}
+    assert profiler.blits == 3
+    children[1].mark_dirty()
+    profiler.begin_frame()
+    tree.draw()
+    # Область изменившегося ребёнка перерисовывается вместе с частью корня под ним.
+    assert set(profiler.widgets) == {repr(tree), repr(children[1])}
+    assert profiler.blits == 2
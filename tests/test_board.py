@@ -0,0 +1,92 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from game.board import LINE_SCORE, Board
+from game.shapes import shape_registry
+
+SIZES = [(8, 8), (5, 7), (10, 6)]
+
+
+def naive_can_place(grid: np.ndarray, cells: np.ndarray, x: int, y: int) -> bool:
+    height, width = cells.shape
+    if x < 0 or y < 0 or x + width > grid.shape[1] or y + height > grid.shape[0]:
+        return False
+    return not (grid[y:y + height, x:x + width] & cells).any()
+
+
+def naive_place(grid: np.ndarray, cells: np.ndarray, x: int, y: int) -> tuple[list[int], list[int]]:
+    """Ставит фигуру в массив и очищает заполненные линии; возвращает их индексы."""
+    height, width = cells.shape
+    grid[y:y + height, x:x + width] |= cells
+    rows = [index for index in range(grid.shape[0]) if grid[index].all()]
+    columns = [index for index in range(grid.shape[1]) if grid[:, index].all()]
+    grid[rows, :] = False
+    grid[:, columns] = False
+    return rows, columns
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_engine_matches_naive_grid(width: int, height: int) -> None:
+    random = Random(width * 100 + height)
+    shapes = [shape for shape in shape_registry(width, height) if shape.width <= width and shape.height <= height]
+    for _ in range(20):
+        grid = np.zeros((height, width), dtype=bool)
+        board = Board(width, height)
+        score = 0
+        for _ in range(200):
+            shape = random.choice(shapes)
+            cells = shape.array
+            # Позиции и за краем поля: can_place должен отвергать их, а не заворачивать биты на соседнюю строку.
+            x = random.randint(-2, width)
+            y = random.randint(-2, height)
+            legal = naive_can_place(grid, cells, x, y)
+            assert board.can_place(shape, x, y) == legal
+            if not legal:
+                with pytest.raises(ValueError):
+                    board.place(shape, x, y)
+                continue
+            completed = board.completed(shape, x, y)
+            rows, columns = naive_place(grid, cells, x, y)
+            assert completed == (rows, columns)
+            lines = board.place(shape, x, y)
+            score += shape.size + LINE_SCORE * lines * lines
+            assert lines == len(rows) + len(columns)
+            assert board.score == score
+            assert np.array_equal(board.cells, grid)
+            assert board.full_lines() == ([], [])
+            assert Board.from_cells(grid) == board
+            for other in shapes:
+                fits = any(
+                    naive_can_place(grid, other.array, px, py)
+                    for py in range(height - other.height + 1)
+                    for px in range(width - other.width + 1)
+                )
+                assert other.fits(board.bits) == fits
+
+
+@pytest.mark.parametrize("width, height", SIZES)
+def test_cells_round_trip(width: int, height: int) -> None:
+    generator = np.random.default_rng(width * height)
+    for _ in range(50):
+        grid = generator.random((height, width)) < 0.5
+        board = Board.from_cells(grid, 7)
+        assert np.array_equal(board.cells, grid)
+        assert board.score == 7
+        assert all(((x, y) in board) == grid[y, x] for y in range(height) for x in range(width))
+
+
+def test_clear_lines_matches_naive_grid() -> None:
+    generator = np.random.default_rng(1)
+    for _ in range(200):
+        grid = generator.random((8, 8)) < 0.8
+        grid[generator.integers(8), :] = True
+        board = Board.from_cells(grid)
+        rows = [index for index in range(8) if grid[index].all()]
+        columns = [index for index in range(8) if grid[:, index].all()]
+        assert board.full_lines() == (rows, columns)
+        assert board.clear_lines() == len(rows) + len(columns)
+        grid[rows, :] = False
+        grid[:, columns] = False
+        assert np.array_equal(board.cells, grid)
@@ -0,0 +1,34 @@
+from os import environ
+
+environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from game.objects import ShapeAtlas  # noqa: E402
+from game.rules import Game  # noqa: E402
+from game.shapes import parse_shape, shape_registry  # noqa: E402
+from game.widgets.board import BoardWidget  # noqa: E402
+
+# Тема без цвета поля по умолчанию.
+PALETTE = {
+    "amber": ((230, 160, 20), (245, 210, 130), (160, 110, 15), (150, 100, 10), (100, 70, 5)),
+    "teal": ((20, 160, 150), (130, 210, 205), (15, 110, 105), (10, 100, 95), (5, 70, 65)),
+}
+
+
+def test_renders_palette_without_default_block_color() -> None:
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+    registry = shape_registry()
+    game = Game(registry, 1)
+    shape = game.offered[0]
+    game.play(shape, 0, 0)
+    atlas = ShapeAtlas(PALETTE, {shape.source: parse_shape(shape.source) for shape in registry}, 43, 4, 1)
+    board = BoardWidget(screen, (0, 0), game, atlas, PALETTE)
+    assert board.block_color == "amber"
+    x, y = shape.cells[0]
+    # В клетке блока нарисован основной оттенок первой палитры, а не пустое поле.
+    center = board.surface.get_at((x * board.CELL + board.CELL // 2, y * board.CELL + board.CELL // 2))
+    assert tuple(center)[:3] == PALETTE["amber"][0]
+    board.use_atlas(atlas, {"teal": PALETTE["teal"]})
+    assert board.block_color == "teal"
@@ -0,0 +1,78 @@
+from random import Random
+
+import pytest
+
+from game.replay import (
+    HEADER, MAX_COUNT, Recorder, Replay, ReplayError, catalogue_digest, decode, encode, iter_replays, verify
+)
+from game.rules import OFFERED, Game
+from game.shapes import shape_registry
+
+
+def recorded(seed: int, moves: int | None = None) -> Replay:
+    """Случайная партия до конца или до moves ходов."""
+    registry = shape_registry()
+    recorder = Recorder(Game(registry, seed))
+    random = Random(seed)
+    game = recorder.game
+    while moves is None or game.moves < moves:
+        options = [(shape, x, y) for shape in game.offered for x, y in shape.positions(game.board.bits)]
+        if not options:
+            break
+        recorder.play(*random.choice(options))
+    return recorder.replay
+
+
+@pytest.mark.parametrize("moves", [0, 1, OFFERED - 1, OFFERED, OFFERED + 1, None])
+def test_round_trip_verifies(moves: int | None) -> None:
+    replay = recorded(7, moves)
+    data = encode(replay)
+    decoded, offset = decode(data)
+    assert decoded == replay
+    assert offset == len(data)
+    assert verify([decoded], shape_registry()) == len(replay.moves)
+
+
+def test_corpus_of_concatenated_replays() -> None:
+    replays = [recorded(seed) for seed in range(5)]
+    assert list(iter_replays(b"".join(encode(replay) for replay in replays))) == replays
+
+
+def test_limit_values_round_trip() -> None:
+    # Больше 65535 ходов: в первой версии формата счётчик ходов был uint16.
+    count = 70_000
+    deals = tuple((0, 1, 2) for _ in range(count // OFFERED + 1))
+    moves = tuple((index % 256, 255) for index in range(count))
+    replay = Replay(2 ** 64 - 1, 16, 16, catalogue_digest(shape_registry()), deals, moves, MAX_COUNT, MAX_COUNT, 1)
+    decoded, _ = decode(encode(replay))
+    assert decoded == replay
+
+
+@pytest.mark.parametrize("field", ["score", "lines"])
+def test_encode_rejects_values_over_the_limit(field: str) -> None:
+    replay = recorded(3)._replace(**{field: MAX_COUNT + 1})
+    with pytest.raises(ValueError, match=field):
+        encode(replay)
+
+
+def test_encode_rejects_boards_over_the_limit() -> None:
+    with pytest.raises(ValueError, match="board cells"):
+        encode(recorded(3)._replace(width=17, height=16))
+
+
+def test_verify_detects_tampering() -> None:
+    replay = recorded(11)
+    with pytest.raises(ReplayError, match="Final state"):
+        verify([replay._replace(score=replay.score + 1)], shape_registry())
+    with pytest.raises(ReplayError, match="Truncated"):
+        decode(encode(replay)[:-1])
+
+
+def test_verify_rejects_corrupted_deal() -> None:
+    replay = recorded(5)
+    data = bytearray(encode(replay))
+    # Первый байт тела — первая фигура первой выдачи.
+    data[HEADER.size + (replay.width * replay.height + 7) // 8] = 255
+    decoded, _ = decode(bytes(data))
+    with pytest.raises(ReplayError, match="Deal 0"):
+        verify([decoded], shape_registry())
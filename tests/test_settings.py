@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+from settings import schema_digest
+
+
+def schema(kind: type, nested: type) -> tuple[type, type]:
+    @dataclass
+    class Inner:
+        value: nested
+
+    @dataclass
+    class Outer:
+        field: kind
+        inner: list[Inner]
+
+    return Outer, Inner
+
+
+def test_schema_digest_follows_field_types() -> None:
+    digest = schema_digest(schema(int, str)[0])
+    assert schema_digest(schema(int, str)[0]) == digest
+    assert schema_digest(schema(float, str)[0]) != digest
+    # Изменение вложенного dataclass меняет и хэш внешнего.
+    assert schema_digest(schema(int, bytes)[0]) != digest
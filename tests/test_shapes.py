@@ -0,0 +1,50 @@
+from random import Random
+
+import pytest
+
+from game.shapes import ShapeRegistry, parse_shape, shape_registry
+from settings import settings
+
+
+def brute_force(cells: list[tuple[int, int]], bits: int, width: int = 8, height: int = 8) -> list[tuple[int, int]]:
+    """Все позиции левого верхнего угла, где каждая клетка фигуры на поле и свободна; перебором клеток."""
+    min_x = min(x for x, _ in cells)
+    min_y = min(y for _, y in cells)
+    cells = [(x - min_x, y - min_y) for x, y in cells]
+    positions = []
+    for top in range(-height, height):
+        for left in range(-width, width):
+            if all(
+                0 <= left + x < width and 0 <= top + y < height and not bits >> ((top + y) * width + left + x) & 1
+                for x, y in cells
+            ):
+                positions.append((left, top))
+    return sorted(positions, key=lambda position: (position[1], position[0]))
+
+
+@pytest.mark.parametrize("source", list(settings.shapes))
+def test_placements_match_brute_force(source: str) -> None:
+    shape = shape_registry()[source]
+    cells = parse_shape(source)
+    assert [(x, y) for x, y, _ in shape.placements] == brute_force(cells, 0)
+    for x, y, mask in shape.placements:
+        assert mask == sum(1 << ((y + cy) * 8 + x + cx) for cx, cy in shape.cells)
+    random = Random(source)
+    for _ in range(50):
+        bits = random.getrandbits(64) & random.getrandbits(64)
+        positions = brute_force(cells, bits)
+        assert shape.positions(bits) == positions
+        assert shape.fits(bits) == bool(positions)
+
+
+def test_index_follows_shapes_json_order() -> None:
+    registry = shape_registry()
+    sources = list(settings.shapes)
+    assert [shape.source for shape in registry] == sources
+    assert [registry.index(registry[source]) for source in sources] == list(range(len(sources)))
+
+
+def test_index_rejects_foreign_shapes() -> None:
+    other = ShapeRegistry(list(settings.shapes))
+    with pytest.raises(KeyError):
+        shape_registry().index(other[next(iter(settings.shapes))])
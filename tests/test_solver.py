@@ -0,0 +1,51 @@
+from time import sleep, time
+
+import numpy as np
+import pytest
+
+from game.board import Board
+from game.shapes import shape_registry
+from game.solver import Solver
+from settings import settings
+
+
+@pytest.fixture(scope="module")
+def solver():
+    solver = Solver(list(settings.shapes), workers=1)
+    solver.start()
+    yield solver
+    solver.shutdown()
+
+
+def wait(request, timeout: float) -> float:
+    """Ждёт, пока все части поиска завершатся; возвращает, сколько это заняло."""
+    started = time()
+    while not request.done or request.progress < 1.0:
+        assert time() - started < timeout
+        sleep(0.01)
+    return time() - started
+
+
+def test_solve_returns_legal_moves(solver: Solver) -> None:
+    # Почти заполненное поле: перебор заканчивается задолго до бюджета.
+    cells = np.ones((8, 8), dtype=bool)
+    cells[:, :3] = False
+    cells[5:, :] = False
+    board = Board.from_cells(cells)
+    offered = list(settings.shapes)[:3]
+    request = solver.solve(board, offered, 20.0)
+    wait(request, 20.0)
+    solution = request.result()
+    assert solution is not None and solution.moves
+    registry = shape_registry()
+    for move in solution.moves:
+        assert move.shape in offered
+        board.place(registry[move.shape], move.x, move.y)
+
+
+def test_cancel_stops_running_search(solver: Solver) -> None:
+    request = solver.solve(Board(8, 8), list(settings.shapes)[:3], 60.0)
+    sleep(0.2)
+    request.cancel()
+    assert request.done
+    assert wait(request, 2.0) < 2.0